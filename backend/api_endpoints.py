@@ -27,6 +27,10 @@ from security.field_encryption import encrypt_document_fields
 
 router = APIRouter(prefix="/api", tags=["processing"])
 
+# Fields encrypted at rest in the answers collection
+AUDIO_ANSWER_ENCRYPTED_FIELDS = ("transcribed_text", "cleaned_text")
+TEXT_ANSWER_ENCRYPTED_FIELDS = ("original_text", "cleaned_text")
+
 # ===== Session Management =====
 @router.post("/session/start", response_model=SessionResponse, status_code=201)
 async def start_session(session_data: SessionCreate, database = Depends(get_database)):
@@ -164,13 +168,14 @@ async def upload_audio(
                 # Encrypt sensitive fields before storage
                 encrypted_doc = encrypt_document_fields(
                     answer_doc,
-                    fields_to_encrypt=["transcribed_text", "cleaned_text"],
+                    fields_to_encrypt=AUDIO_ANSWER_ENCRYPTED_FIELDS,
                     associated_data={
                         "collection": "answers",
                         "session_id": session_id,
                         "user_id": session["user_id"],
                         "consent_id": session["consent_id"]
-                    }
+                    },
+                    inplace=True
                 )
                 await database.answers.insert_one(encrypted_doc)
                 stored_data = True
@@ -341,13 +346,14 @@ async def process_text(
             # Encrypt sensitive text fields before storage
             encrypted_doc = encrypt_document_fields(
                 answer_doc,
-                fields_to_encrypt=["original_text", "cleaned_text"],
+                fields_to_encrypt=TEXT_ANSWER_ENCRYPTED_FIELDS,
                 associated_data={
                     "collection": "answers",
                     "session_id": request.session_id,
                     "user_id": session["user_id"],
                     "consent_id": session["consent_id"]
-                }
+                },
+                inplace=True
             )
             await database.answers.insert_one(encrypted_doc)
             logger.info(f"✓ Text (encrypted) and tokens stored for session {request.session_id}")
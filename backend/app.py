@@ -64,6 +64,22 @@ except Exception as e:
     deletion_log = None
     user_consent_logs = None
 
+def reconnect_mongo_after_fork():
+    """
+    Give a forked server worker its own MongoClient
+    
+    PyMongo clients are not fork-safe, so the client opened at import time
+    (before a preloading server forks) must not be used by the workers.
+    """
+    global client, db, interviews, deletion_log, user_consent_logs
+    if interviews is None:
+        return
+    client = MongoClient('mongodb://localhost:27017/', serverSelectionTimeoutMS=5000)
+    db = client['interview_db']
+    interviews = db['interviews']
+    deletion_log = db['deletion_log']
+    user_consent_logs = db['user_consent_logs']
+
 # Import NLP/CV functions with graceful degradation
 try:
     from nlp_processor import transcribe_video, anonymize_text, assess_answer, analyze_facial_expressions
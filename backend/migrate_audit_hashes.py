@@ -0,0 +1,56 @@
+"""
+Audit Log Hash Migration Script
+Convert hex-string entry_hash/prev_hash values to 32-byte BSON Binary
+"""
+from bson import Binary
+from pymongo import MongoClient, UpdateOne
+
+BATCH_SIZE = 1000
+
+def connect_db():
+    """Connect to MongoDB"""
+    try:
+        client = MongoClient('mongodb://localhost:27017/', serverSelectionTimeoutMS=2000)
+        client.server_info()
+        db = client['interview_db']
+        return db, client
+    except Exception as e:
+        print(f"✗ MongoDB connection failed: {e}")
+        return None, None
+
+def migrate_hashes(db):
+    """Hex-decode stored audit hashes in place"""
+    collection = db['access_audit_logs']
+    query = {"$or": [
+        {"entry_hash": {"$type": "string"}},
+        {"prev_hash": {"$type": "string"}}
+    ]}
+
+    migrated = 0
+    batch = []
+    for entry in collection.find(query, {"entry_hash": 1, "prev_hash": 1}):
+        update = {}
+        for field in ("entry_hash", "prev_hash"):
+            value = entry.get(field)
+            if isinstance(value, str):
+                update[field] = Binary(bytes.fromhex(value))
+        batch.append(UpdateOne({"_id": entry["_id"]}, {"$set": update}))
+
+        if len(batch) >= BATCH_SIZE:
+            migrated += collection.bulk_write(batch, ordered=False).modified_count
+            batch = []
+
+    if batch:
+        migrated += collection.bulk_write(batch, ordered=False).modified_count
+
+    print(f"✓ Migrated {migrated} audit log entries")
+    return migrated
+
+if __name__ == "__main__":
+    print("\n🔐 AI INTERVIEW - AUDIT HASH MIGRATION\n")
+    db, client = connect_db()
+    if db is None:
+        print("\n⚠️  Cannot continue without database connection")
+    else:
+        migrate_hashes(db)
+        client.close()
@@ -6,10 +6,12 @@ Provides encryption, RBAC, and audit logging
 from .key_store import (
     init_key_store,
     get_current_key_store,
+    warm_key_store,
     KeyStore,
     LocalKeyStore,
     AWSKMSKeyStore,
-    GCPKMSKeyStore
+    GCPKMSKeyStore,
+    secure_wipe
 )
 
 from .field_encryption import (
@@ -39,9 +41,13 @@ from .rbac import (
 
 from .audit_logger import (
     AuditLogger,
+    AuditSink,
+    MongoSink,
+    KafkaSink,
     init_audit_logger,
     get_audit_logger,
-    audit_log
+    audit_log,
+    verify_merkle_proof
 )
 
 __version__ = '1.0.0'
@@ -50,10 +56,12 @@ __all__ = [
     # Key Store
     'init_key_store',
     'get_current_key_store',
+    'warm_key_store',
     'KeyStore',
     'LocalKeyStore',
     'AWSKMSKeyStore',
     'GCPKMSKeyStore',
+    'secure_wipe',
     
     # Encryption
     'encrypt_field',
@@ -80,7 +88,11 @@ __all__ = [
     
     # Audit Logging
     'AuditLogger',
+    'AuditSink',
+    'MongoSink',
+    'KafkaSink',
     'init_audit_logger',
     'get_audit_logger',
-    'audit_log'
+    'audit_log',
+    'verify_merkle_proof'
 ]
@@ -0,0 +1,72 @@
+"""
+Audit Logging Hot Path
+Entry construction and chain hashing for AuditLogger.log
+
+Fully annotated and free of Flask/pymongo objects so it can be compiled
+with mypyc (mypyc backend/security/_audit_hot.py). The compiled extension
+is imported when present, this source otherwise.
+"""
+
+import hashlib
+import struct
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+def build_entry(
+    actor_id: str,
+    actor_roles: List[str],
+    action: str,
+    target_collection: Optional[str],
+    target_id: Optional[str],
+    fields_accessed: List[str],
+    justification: Optional[str],
+    success: bool,
+    ip: Optional[str],
+    user_agent: Optional[str],
+    timestamp: datetime,
+    metadata: Dict[str, Any],
+    hash_version: int
+) -> Dict[str, Any]:
+    """Create an unhashed audit log entry"""
+    return {
+        "actor_id": actor_id,
+        "actor_roles": actor_roles,
+        "action": action,
+        "target_collection": target_collection,
+        "target_id": target_id,
+        "fields_accessed": fields_accessed,
+        "justification": justification,
+        "success": success,
+        "ip": ip,
+        "user_agent": user_agent,
+        "timestamp": timestamp,
+        "metadata": metadata,
+        "hash_version": hash_version
+    }
+
+
+def chain_hash(
+    timestamp: datetime,
+    actor_id: str,
+    action: str,
+    target_id: Optional[str],
+    prev_bytes: bytes
+) -> bytes:
+    """
+    SHA-256 over the length-prefixed entry fields and previous chain link
+    Each field is preceded by its 4-byte big-endian length, so free-form
+    values (which may contain any byte) cannot shift into their neighbours
+    """
+    fields = (
+        timestamp.isoformat().encode('ascii'),
+        actor_id.encode('utf-8'),
+        action.encode('utf-8'),
+        (target_id or '').encode('utf-8'),
+        prev_bytes
+    )
+    digest = hashlib.sha256()
+    for field in fields:
+        digest.update(struct.pack('>I', len(field)))
+        digest.update(field)
+    return digest.digest()
@@ -4,60 +4,319 @@ Write-only audit logs for security-sensitive operations
 """
 
 import os
+import atexit
 import hashlib
 import logging
-from typing import Dict, List, Optional, Any
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Dict, List, Optional, Any, Tuple, Union
 from datetime import datetime
-from bson import ObjectId
+import bson
+from bson import Binary, ObjectId, json_util
 from flask import request, g
 
+from ._audit_hot import build_entry, chain_hash
+
 logger = logging.getLogger(__name__)
 
+# Default query_logs projection: drops the heavy per-entry context blobs
+LIGHTWEIGHT_LOG_PROJECTION = {"metadata": 0, "user_agent": 0}
+
+# Hash input format written to new entries (entries without a
+# hash_version field use the original undelimited format)
+CHAIN_HASH_VERSION = 3
+
+# Bump when _ensure_indexes changes so existing deployments re-create indexes
+AUDIT_INDEX_SCHEMA = 3
+
+
+def _as_digest(value: Union[str, bytes, None]) -> Optional[bytes]:
+    """Normalize a stored hash (hex string or BSON binary) to raw bytes"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return bytes.fromhex(value)
+    return bytes(value)
+
+
+def _merkle_levels(hashes: List[bytes]) -> List[List[bytes]]:
+    """All Merkle tree levels, leaves first (odd nodes are paired with themselves)"""
+    level = list(hashes) or [hashlib.sha256(b'').digest()]
+    levels = [level]
+    while len(level) > 1:
+        if len(level) % 2:
+            level = level + [level[-1]]
+        level = [
+            hashlib.sha256(level[i] + level[i + 1]).digest()
+            for i in range(0, len(level), 2)
+        ]
+        levels.append(level)
+    return levels
+
+
+def _merkle_root(hashes: List[bytes]) -> bytes:
+    """Merkle root over a list of hashes"""
+    return _merkle_levels(hashes)[-1][0]
+
+
+def _merkle_leaf(entry_hash: bytes) -> bytes:
+    """Merkle leaf for an audit entry"""
+    return hashlib.sha256(entry_hash).digest()
+
+
+def verify_merkle_proof(leaf: bytes, index: int, proof: List[bytes], root: bytes) -> bool:
+    """
+    Check an inclusion proof from AuditLogger.get_merkle_proof
+    
+    Costs one hash per tree level, i.e. O(log N) for N checkpointed entries.
+    """
+    node = bytes(leaf)
+    for sibling in proof:
+        if index % 2:
+            node = hashlib.sha256(bytes(sibling) + node).digest()
+        else:
+            node = hashlib.sha256(node + bytes(sibling)).digest()
+        index //= 2
+    return node == bytes(root)
+
+
+class AuditSink(ABC):
+    """Abstract destination for chained audit entries"""
+    
+    @abstractmethod
+    def write(self, log_entry: Dict):
+        """Write one audit entry (entry already carries its _id)"""
+        pass
+    
+    @abstractmethod
+    def write_many(self, log_entries: List[Dict]):
+        """Write a batch of audit entries in order"""
+        pass
+    
+    def flush(self):
+        """Block until previously written entries are delivered"""
+        pass
+
+
+class MongoSink(AuditSink):
+    """Writes audit entries straight to the MongoDB audit collection"""
+    
+    def __init__(self, collection):
+        self.collection = collection
+    
+    def write(self, log_entry: Dict):
+        self.collection.insert_one(log_entry)
+    
+    def write_many(self, log_entries: List[Dict]):
+        self.collection.insert_many(log_entries, ordered=True)
+
+
+class KafkaSink(AuditSink):
+    """
+    Publishes audit entries to Kafka via librdkafka (confluent-kafka)
+    
+    produce() only enqueues; batching, compression and delivery run on
+    librdkafka's background thread. Entries are keyed by actor shard so each
+    chain stays ordered within a partition. MongoDB is fed downstream by a
+    consumer of the topic.
+    """
+    
+    def __init__(self, bootstrap_servers: str, topic: str = 'audit', config: Optional[Dict] = None):
+        self.topic = topic
+        
+        try:
+            from confluent_kafka import Producer
+            self.producer = Producer({
+                "bootstrap.servers": bootstrap_servers,
+                "enable.idempotence": True,
+                "compression.type": "lz4",
+                "linger.ms": 5,
+                **(config or {})
+            })
+            logger.info(f"Audit Kafka sink initialized: {topic}")
+        except ImportError:
+            raise RuntimeError("confluent-kafka required for Kafka audit sink. Install: pip install confluent-kafka")
+    
+    def _on_delivery(self, err, msg):
+        if err is not None:
+            logger.error(f"CRITICAL: Audit event delivery failed: {err}")
+    
+    def write(self, log_entry: Dict):
+        self.producer.produce(
+            self.topic,
+            key=log_entry["actor_id"].encode('utf-8'),
+            value=json_util.dumps(log_entry).encode('utf-8'),
+            on_delivery=self._on_delivery
+        )
+        # Serve delivery callbacks without blocking
+        self.producer.poll(0)
+    
+    def write_many(self, log_entries: List[Dict]):
+        for log_entry in log_entries:
+            self.write(log_entry)
+    
+    def flush(self):
+        self.producer.flush()
+
+
+class AuditSegment:
+    """
+    Buffer of chained audit entries for one shard, written in one batch
+    
+    A segment is full at max_entries entries or once the BSON size of its
+    entries reaches max_bytes.
+    """
+    
+    def __init__(self, shard: str, max_entries: int = 64, max_bytes: int = 4096):
+        self.shard = shard
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: List[Dict] = []
+        self.size_bytes = 0
+    
+    def add(self, log_entry: Dict):
+        self.entries.append(log_entry)
+        self.size_bytes += len(bson.encode(log_entry))
+    
+    def is_full(self) -> bool:
+        return len(self.entries) >= self.max_entries or self.size_bytes >= self.max_bytes
+    
+    def summary(self) -> Dict:
+        """Segment record: Merkle root over the buffered entry hashes"""
+        return {
+            "_id": ObjectId(),
+            "shard": self.shard,
+            "segment_hash": Binary(_merkle_root([bytes(e["entry_hash"]) for e in self.entries])),
+            "entry_ids": [e["_id"] for e in self.entries],
+            "entry_count": len(self.entries),
+            "size_bytes": self.size_bytes,
+            "created_at": datetime.utcnow()
+        }
+
 
 class AuditLogger:
     """Immutable audit logger for security events"""
     
-    def __init__(self, db):
+    def __init__(
+        self,
+        db,
+        segment_max_entries: int = 1,
+        segment_max_bytes: int = 4096,
+        sink: Optional[AuditSink] = None
+    ):
         """
         Initialize audit logger
         
         Args:
             db: MongoDB database instance
+            segment_max_entries: Entries buffered per shard before one batched
+                write; 1 (the default) writes every entry immediately. Values
+                above 1 are an opt-in trade of durability for throughput:
+                log() returns an entry id before the entry is persisted, and
+                buffered entries are lost if the process crashes or is
+                killed. They are flushed on normal interpreter exit.
+            segment_max_bytes: BSON size at which a segment is written early
+            sink: Where entries are written (defaults to the MongoDB collection)
         """
         self.db = db
         self.collection = db.access_audit_logs
+        self.sink = sink or MongoSink(self.collection)
+        self.segments_collection = db.access_audit_segments
+        self.checkpoints_collection = db.access_audit_checkpoints
+        self.segment_max_entries = segment_max_entries
+        self.segment_max_bytes = segment_max_bytes
+        self._segments: Dict[str, AuditSegment] = {}
         self._ensure_indexes()
-        self._last_hash = None
+        # Hash chains are sharded by actor_id so writers for different
+        # actors do not serialize on a single chain head. Each head is the
+        # shard's last entry hash and the seq for its next entry.
+        self._shard_heads: Dict[str, Tuple[Optional[bytes], int]] = {}
+        self._shard_locks = defaultdict(threading.Lock)
+        self._shard_locks_guard = threading.Lock()
+        
+        if self.segment_max_entries > 1 or not isinstance(self.sink, MongoSink):
+            atexit.register(self._flush_at_exit)
     
     def _ensure_indexes(self):
-        """Create indexes for audit logs"""
+        """Create indexes for audit logs (skipped if already at AUDIT_INDEX_SCHEMA)"""
         try:
+            marker = self.db.audit_meta.find_one({"_id": "access_audit_logs"})
+            if marker and marker.get("schema_version") == AUDIT_INDEX_SCHEMA:
+                return
+            
             # Indexes for common queries
             self.collection.create_index("actor_id")
             self.collection.create_index("action")
             self.collection.create_index("timestamp")
             self.collection.create_index([("actor_id", 1), ("timestamp", -1)])
             self.collection.create_index([("action", 1), ("timestamp", -1)])
+            self.collection.create_index([("actor_id", 1), ("action", 1), ("timestamp", -1)])
             self.collection.create_index("target_id")
             self.collection.create_index("success")
+            # Per-shard sequence numbers order chains and Merkle checkpoints;
+            # unique so two writers cannot extend the same shard head
+            self.collection.create_index(
+                [("actor_id", 1), ("seq", 1)],
+                unique=True,
+                partialFilterExpression={"seq": {"$exists": True}}
+            )
+            
+            self.db.audit_meta.update_one(
+                {"_id": "access_audit_logs"},
+                {"$set": {"schema_version": AUDIT_INDEX_SCHEMA, "updated_at": datetime.utcnow()}},
+                upsert=True
+            )
             
             logger.info("✓ Audit log indexes created")
         except Exception as e:
             logger.warning(f"Audit log index creation warning: {e}")
     
-    def _compute_hash(self, log_entry: Dict) -> str:
+    def _get_shard_lock(self, shard: str) -> threading.Lock:
+        """Get the lock guarding a chain shard"""
+        with self._shard_locks_guard:
+            return self._shard_locks[shard]
+    
+    def _get_shard_head(self, shard: str) -> Tuple[Optional[bytes], int]:
+        """
+        Get last hash and next seq of a chain shard (caller holds the shard lock)
+        Seeds from the highest-seq stored entry on first use; legacy entries
+        belong to the global pre-sharding chain, so a shard whose actor only
+        has legacy entries starts a new chain at seq 0
+        """
+        if shard not in self._shard_heads:
+            last_entry = self.collection.find_one(
+                {"actor_id": shard, "seq": {"$exists": True}},
+                {"entry_hash": 1, "seq": 1},
+                sort=[("seq", -1)]
+            )
+            if last_entry:
+                self._shard_heads[shard] = (_as_digest(last_entry.get("entry_hash")), last_entry["seq"] + 1)
+            else:
+                self._shard_heads[shard] = (None, 0)
+        return self._shard_heads[shard]
+    
+    def _compute_hash(self, log_entry: Dict, prev_hash: Optional[bytes]) -> bytes:
         """
-        Compute tamper-evident hash for log entry
-        Includes previous hash for chain integrity
+        Compute tamper-evident hash (raw SHA-256 digest) for log entry
+        Includes the previous hash of the entry's chain for chain integrity
         """
-        # Create deterministic string from log entry
-        hash_input = f"{log_entry['timestamp'].isoformat()}" \
-                    f"{log_entry['actor_id']}" \
-                    f"{log_entry['action']}" \
-                    f"{log_entry.get('target_id', '')}" \
-                    f"{self._last_hash or ''}"
+        if log_entry.get("hash_version") is None:
+            # Legacy entry: original string format chaining the hex digest
+            hash_input = f"{log_entry['timestamp'].isoformat()}" \
+                        f"{log_entry['actor_id']}" \
+                        f"{log_entry['action']}" \
+                        f"{log_entry.get('target_id', '')}" \
+                        f"{prev_hash.hex() if prev_hash else ''}"
+            return hashlib.sha256(hash_input.encode('utf-8')).digest()
         
-        return hashlib.sha256(hash_input.encode('utf-8')).hexdigest()
+        return chain_hash(
+            log_entry['timestamp'],
+            log_entry['actor_id'],
+            log_entry['action'],
+            log_entry.get('target_id'),
+            prev_hash or b''
+        )
     
     def log(
         self,
@@ -86,7 +345,8 @@ class AuditLogger:
             metadata: Additional context
         
         Returns:
-            ObjectId of audit log entry
+            ObjectId of audit log entry (with segment buffering, the entry
+            may not be persisted yet when this returns)
         """
         try:
             # Extract actor info from Flask context if not provided
@@ -103,44 +363,96 @@ class AuditLogger:
                 ip_address = request.remote_addr
                 user_agent = request.headers.get('User-Agent')
             
+            # MongoDB stores millisecond precision; truncate so the hash
+            # recomputed from the stored entry matches
             timestamp = datetime.utcnow()
+            timestamp = timestamp.replace(microsecond=timestamp.microsecond // 1000 * 1000)
             
             # Create log entry
-            log_entry = {
-                "actor_id": actor_id or "anonymous",
-                "actor_roles": actor_roles or [],
-                "action": action,
-                "target_collection": target_collection,
-                "target_id": target_id,
-                "fields_accessed": fields_accessed or [],
-                "justification": justification,
-                "success": success,
-                "ip": ip_address,
-                "user_agent": user_agent,
-                "timestamp": timestamp,
-                "metadata": metadata or {}
-            }
-            
-            # Compute tamper-evident hash
-            entry_hash = self._compute_hash(log_entry)
-            log_entry["entry_hash"] = entry_hash
-            log_entry["prev_hash"] = self._last_hash
-            
-            # Insert (write-only, no updates allowed)
-            result = self.collection.insert_one(log_entry)
+            log_entry = build_entry(
+                actor_id or "anonymous",
+                actor_roles or [],
+                action,
+                target_collection,
+                target_id,
+                fields_accessed or [],
+                justification,
+                success,
+                ip_address,
+                user_agent,
+                timestamp,
+                metadata or {},
+                CHAIN_HASH_VERSION
+            )
             
-            # Update last hash for chain
-            self._last_hash = entry_hash
+            shard = log_entry["actor_id"]
+            with self._get_shard_lock(shard):
+                # Compute tamper-evident hash
+                prev_hash, seq = self._get_shard_head(shard)
+                entry_hash = chain_hash(timestamp, shard, action, target_id, prev_hash or b'')
+                log_entry["entry_hash"] = Binary(entry_hash)
+                log_entry["prev_hash"] = Binary(prev_hash) if prev_hash else None
+                log_entry["merkle_leaf"] = Binary(_merkle_leaf(entry_hash))
+                log_entry["seq"] = seq
+                
+                log_entry["_id"] = ObjectId()
+                
+                if self.segment_max_entries > 1:
+                    # Buffer into the shard's segment; written when full
+                    segment = self._segments.get(shard)
+                    if segment is None:
+                        segment = AuditSegment(
+                            shard, self.segment_max_entries, self.segment_max_bytes
+                        )
+                        self._segments[shard] = segment
+                    segment.add(log_entry)
+                    self._shard_heads[shard] = (entry_hash, seq + 1)
+                    if segment.is_full():
+                        self._flush_segment(shard)
+                else:
+                    # Insert (write-only, no updates allowed)
+                    self.sink.write(log_entry)
+                    
+                    # Advance the chain head
+                    self._shard_heads[shard] = (entry_hash, seq + 1)
             
             logger.debug(f"Audit log created: {action} by {actor_id}")
             
-            return result.inserted_id
+            return log_entry["_id"]
         
         except Exception as e:
             logger.error(f"CRITICAL: Failed to write audit log: {e}")
             # Audit log failure is critical - consider alerting
             raise
     
+    def _flush_segment(self, shard: str):
+        """Write a shard's buffered segment (caller holds the shard lock)"""
+        segment = self._segments.pop(shard, None)
+        if segment is None or not segment.entries:
+            return
+        
+        try:
+            self.sink.write_many(segment.entries)
+            self.segments_collection.insert_one(segment.summary())
+        except Exception:
+            # Unwritten entries are gone; reseed the chain head from storage
+            self._shard_heads.pop(shard, None)
+            raise
+    
+    def _flush_at_exit(self):
+        """Write buffered entries on interpreter exit; errors are logged, not raised"""
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"CRITICAL: Failed to flush buffered audit logs at exit: {e}")
+    
+    def flush(self):
+        """Write all buffered audit segments"""
+        for shard in list(self._segments):
+            with self._get_shard_lock(shard):
+                self._flush_segment(shard)
+        self.sink.flush()
+    
     def log_read(
         self,
         target_collection: str,
@@ -265,11 +577,16 @@ class AuditLogger:
         to_date: Optional[datetime] = None,
         success: Optional[bool] = None,
         limit: int = 100,
-        skip: int = 0
+        skip: int = 0,
+        projection: Optional[Dict] = LIGHTWEIGHT_LOG_PROJECTION
     ) -> List[Dict]:
         """
         Query audit logs (READ-ONLY, admin access required)
         
+        Args:
+            projection: MongoDB projection for returned entries; defaults to
+                dropping metadata and user_agent, pass None for full entries
+        
         Returns:
             List of audit log entries
         """
@@ -294,8 +611,10 @@ class AuditLogger:
             if to_date:
                 query["timestamp"]["$lte"] = to_date
         
+        self.flush()
+        
         # Query with pagination
-        cursor = self.collection.find(query) \
+        cursor = self.collection.find(query, projection) \
                                .sort("timestamp", -1) \
                                .skip(skip) \
                                .limit(limit)
@@ -324,48 +643,181 @@ class AuditLogger:
     
     def verify_chain_integrity(self, limit: int = 1000) -> bool:
         """
-        Verify tamper-evident hash chain
+        Verify tamper-evident hash chains
+        
+        Entries written before chain sharding (no hash_version) form one
+        global chain in timestamp order; every later entry belongs to its
+        actor's shard chain, which starts fresh after the legacy chain.
         
         Returns:
-            True if chain is intact, False if tampered
+            True if every chain is intact, False if tampered
         """
-        logs = list(self.collection.find().sort("timestamp", 1).limit(limit))
+        self.flush()
+        logs = list(self.collection.find().sort([("timestamp", 1), ("_id", 1)]).limit(limit))
         
-        prev_hash = None
+        legacy_logs: List[Dict] = []
+        shards: Dict[str, List[Dict]] = defaultdict(list)
         for log_entry in logs:
-            # Check if prev_hash matches
-            if log_entry.get("prev_hash") != prev_hash:
-                logger.error(f"Hash chain broken at entry {log_entry['_id']}")
-                return False
-            
-            # Recompute hash
-            computed_hash = self._compute_hash(log_entry)
-            stored_hash = log_entry.get("entry_hash")
-            
-            if computed_hash != stored_hash:
-                logger.error(f"Hash mismatch at entry {log_entry['_id']}")
-                return False
-            
-            prev_hash = stored_hash
+            if log_entry.get("hash_version") is None:
+                legacy_logs.append(log_entry)
+            else:
+                shards[log_entry.get("actor_id")].append(log_entry)
+        
+        # Shard chains follow seq, which a late segment flush cannot reorder
+        for shard_logs in shards.values():
+            shard_logs.sort(key=lambda log_entry: log_entry.get("seq", -1))
+        
+        for shard_logs in [legacy_logs, *shards.values()]:
+            prev_hash = None
+            for log_entry in shard_logs:
+                # Check if prev_hash matches
+                if _as_digest(log_entry.get("prev_hash")) != prev_hash:
+                    logger.error(f"Hash chain broken at entry {log_entry['_id']}")
+                    return False
+                
+                # Recompute hash
+                computed_hash = self._compute_hash(log_entry, prev_hash)
+                stored_hash = _as_digest(log_entry.get("entry_hash"))
+                
+                if computed_hash != stored_hash:
+                    logger.error(f"Hash mismatch at entry {log_entry['_id']}")
+                    return False
+                
+                leaf = log_entry.get("merkle_leaf")
+                if leaf is not None and bytes(leaf) != _merkle_leaf(stored_hash):
+                    logger.error(f"Merkle leaf mismatch at entry {log_entry['_id']}")
+                    return False
+                
+                prev_hash = stored_hash
         
         logger.info(f"✓ Audit log chain verified ({len(logs)} entries)")
         return True
     
+    def _current_shard_counts(self) -> List[Dict]:
+        """Entry count (next seq) of every shard chain, ordered by shard"""
+        rows = self.collection.aggregate([
+            {"$match": {"seq": {"$exists": True}}},
+            {"$group": {"_id": "$actor_id", "max_seq": {"$max": "$seq"}}}
+        ])
+        counts = {row["_id"]: row["max_seq"] + 1 for row in rows}
+        return [{"shard": shard, "count": counts[shard]} for shard in sorted(counts)]
+    
+    def _checkpoint_leaves(self, shard_counts: List[Dict]) -> Tuple[List[ObjectId], List[bytes]]:
+        """
+        Entry ids and Merkle leaves covered by per-shard counts
+        
+        Leaves are ordered by shard, then seq, and each shard contributes
+        only entries below its count. Entries flushed late (by seq or by
+        timestamp) therefore never move an existing leaf.
+        """
+        limits = {row["shard"]: row["count"] for row in shard_counts}
+        cursor = self.collection.find(
+            {"actor_id": {"$in": list(limits)}, "seq": {"$exists": True}},
+            {"actor_id": 1, "seq": 1, "merkle_leaf": 1}
+        )
+        
+        by_shard: Dict[str, List[Dict]] = defaultdict(list)
+        for log_entry in cursor:
+            if log_entry["seq"] < limits[log_entry["actor_id"]]:
+                by_shard[log_entry["actor_id"]].append(log_entry)
+        
+        ids = []
+        leaves = []
+        for row in shard_counts:
+            for log_entry in sorted(by_shard[row["shard"]], key=lambda e: e["seq"]):
+                ids.append(log_entry["_id"])
+                leaves.append(bytes(log_entry["merkle_leaf"]))
+        return ids, leaves
+    
+    def create_merkle_checkpoint(self) -> Dict:
+        """
+        Record the Merkle root over all current sharded entries
+        
+        Returns:
+            Checkpoint record with root, entry_count and per-shard counts
+        """
+        self.flush()
+        shard_counts = self._current_shard_counts()
+        ids, leaves = self._checkpoint_leaves(shard_counts)
+        
+        checkpoint = {
+            "root": Binary(_merkle_root(leaves)),
+            "entry_count": len(leaves),
+            "shards": shard_counts,
+            "last_entry_id": ids[-1] if ids else None,
+            "created_at": datetime.utcnow()
+        }
+        checkpoint["_id"] = self.checkpoints_collection.insert_one(checkpoint).inserted_id
+        
+        logger.info(f"✓ Audit Merkle checkpoint created ({len(leaves)} entries)")
+        return checkpoint
+    
+    def get_merkle_proof(self, entry_id: ObjectId, checkpoint: Dict) -> Optional[Dict]:
+        """
+        Build an inclusion proof for an entry under a checkpoint
+        
+        Returns:
+            Dict with leaf, index, proof and root for verify_merkle_proof,
+            or None if the entry is not covered by the checkpoint
+        """
+        ids, leaves = self._checkpoint_leaves(checkpoint["shards"])
+        if entry_id not in ids:
+            return None
+        
+        index = ids.index(entry_id)
+        proof = []
+        position = index
+        for level in _merkle_levels(leaves)[:-1]:
+            sibling = position ^ 1
+            proof.append(level[sibling] if sibling < len(level) else level[position])
+            position //= 2
+        
+        return {
+            "leaf": leaves[index],
+            "index": index,
+            "proof": proof,
+            "root": bytes(checkpoint["root"])
+        }
+    
+    def verify_checkpoint(self, checkpoint: Dict) -> bool:
+        """Recompute a checkpoint's Merkle root from the stored entries"""
+        _, leaves = self._checkpoint_leaves(checkpoint["shards"])
+        if len(leaves) != checkpoint["entry_count"]:
+            logger.error("Audit Merkle checkpoint covers missing entries")
+            return False
+        if _merkle_root(leaves) != bytes(checkpoint["root"]):
+            logger.error("Audit Merkle checkpoint root mismatch")
+            return False
+        return True
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get audit log statistics"""
-        total_logs = self.collection.count_documents({})
+        self.flush()
+        
+        # Total, per-action and recent failure counts in one round-trip
+        facets = list(self.collection.aggregate([
+            {"$facet": {
+                "total": [{"$count": "n"}],
+                "by_action": [{"$group": {"_id": "$action", "count": {"$sum": 1}}}],
+                "failed_24h": [
+                    {"$match": {
+                        "success": False,
+                        "timestamp": {"$gte": datetime.utcnow() - timedelta(hours=24)}
+                    }},
+                    {"$count": "n"}
+                ]
+            }}
+        ]))
+        result = facets[0] if facets else {}
+        
+        total_logs = result["total"][0]["n"] if result.get("total") else 0
+        failed_recent = result["failed_24h"][0]["n"] if result.get("failed_24h") else 0
         
         # Count by action
+        counts = {row["_id"]: row["count"] for row in result.get("by_action", [])}
         action_counts = {}
         for action in ["read", "write", "decrypt", "delete", "role_assign", "retention_run"]:
-            count = self.collection.count_documents({"action": action})
-            action_counts[action] = count
-        
-        # Recent failed operations
-        failed_recent = self.collection.count_documents({
-            "success": False,
-            "timestamp": {"$gte": datetime.utcnow() - timedelta(hours=24)}
-        })
+            action_counts[action] = counts.get(action, 0)
         
         return {
             "total_logs": total_logs,
@@ -378,11 +830,11 @@ class AuditLogger:
 # Global audit logger instance
 _audit_logger: Optional[AuditLogger] = None
 
-def init_audit_logger(db):
+def init_audit_logger(db, **kwargs):
     """Initialize global audit logger"""
     global _audit_logger
     if _audit_logger is None:
-        _audit_logger = AuditLogger(db)
+        _audit_logger = AuditLogger(db, **kwargs)
     return _audit_logger
 
 def get_audit_logger() -> Optional[AuditLogger]:
@@ -7,7 +7,10 @@ import os
 import base64
 import json
 import logging
-from typing import Any, Dict, Optional, Tuple
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+import bson
+from bson import Binary
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from datetime import datetime
 
@@ -16,6 +19,130 @@ from .key_store import get_current_key_store, KEY_VERSION
 logger = logging.getLogger(__name__)
 
 
+class _NonceGenerator:
+    """
+    Hands out 96-bit GCM nonces from a prefetched os.urandom pool
+    
+    One getrandom syscall serves many nonces; the pool is discarded in
+    forked children so parent and child never share nonce bytes.
+    """
+    
+    NONCE_SIZE = 12
+    POOL_SIZE = 4096
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+    
+    def _reset(self):
+        self._pool = b''
+        self._offset = 0
+    
+    def _after_fork(self):
+        # The lock may have been held by another thread at fork time
+        self._lock = threading.Lock()
+        self._reset()
+    
+    def next_nonce(self) -> bytes:
+        with self._lock:
+            if self._offset + self.NONCE_SIZE > len(self._pool):
+                self._pool = os.urandom(self.POOL_SIZE)
+                self._offset = 0
+            nonce = self._pool[self._offset:self._offset + self.NONCE_SIZE]
+            self._offset += self.NONCE_SIZE
+            return nonce
+
+
+_nonce_generator = _NonceGenerator()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_nonce_generator._after_fork)
+
+
+def _serialize_aad(aad_dict: Dict) -> bytes:
+    """Canonical byte encoding of associated data (BSON with sorted keys)"""
+    return bson.encode(dict(sorted(aad_dict.items())))
+
+
+def _serialize_aad_legacy(aad_dict: Dict) -> bytes:
+    """JSON AAD encoding used by records that do not store their AAD bytes"""
+    return json.dumps(aad_dict, sort_keys=True).encode('utf-8')
+
+
+def _aad_candidates(associated_data: Dict) -> List[bytes]:
+    """
+    AAD bytes an encrypt path would have produced for this associated data
+    
+    encrypt_field authenticates the serialized dict; encrypt_document
+    serializes it without field_name and appends the field name.
+    """
+    candidates = [_serialize_aad(associated_data)]
+    field_name = associated_data.get('field_name')
+    if isinstance(field_name, str):
+        base_aad = {k: v for k, v in associated_data.items() if k != 'field_name'}
+        candidates.append(_serialize_aad(base_aad) + b"|field_name=" + field_name.encode('utf-8'))
+    return candidates
+
+
+def _encrypt_field_raw(
+    aesgcm: AESGCM,
+    nonce: bytes,
+    plaintext_bytes: bytes,
+    aad_bytes: bytes
+) -> bytes:
+    """Encrypt pre-serialized plaintext and AAD bytes with AES-256-GCM"""
+    return aesgcm.encrypt(nonce, plaintext_bytes, aad_bytes)
+
+
+def _derive_nonce(base_nonce: int, index: int) -> bytes:
+    """
+    Derive the 96-bit nonce for the index-th field of a document
+    
+    The base is drawn fresh for every document, so counter nonces never
+    repeat under the same key within that document.
+    """
+    return ((base_nonce + index) % (1 << 96)).to_bytes(12, 'big')
+
+
+def _to_plaintext_bytes(plaintext: Any) -> bytes:
+    """Convert a field value to bytes for encryption"""
+    if isinstance(plaintext, bytes):
+        return plaintext
+    if isinstance(plaintext, str):
+        return plaintext.encode('utf-8')
+    # JSON serialize for complex types
+    return json.dumps(plaintext).encode('utf-8')
+
+
+def _as_bytes(value: Any) -> bytes:
+    """Read a stored binary field (raw BSON binary, or base64 in older records)"""
+    if isinstance(value, str):
+        return base64.b64decode(value)
+    return bytes(value)
+
+
+def _build_record(
+    nonce: bytes,
+    ciphertext: bytes,
+    key_version: str,
+    aad_dict: Dict,
+    aad_bytes: bytes,
+    encrypted_at: datetime
+) -> Dict[str, Any]:
+    """Assemble the encrypted data package stored for a field"""
+    return {
+        "ciphertext": Binary(ciphertext),
+        "nonce": Binary(nonce),
+        "key_version": key_version,
+        "algorithm": "AES-256-GCM",
+        "associated_data": aad_dict,
+        # Exact AAD bytes used for authentication, so decryption
+        # does not have to re-serialize associated_data
+        "aad": Binary(aad_bytes),
+        "encrypted_at": encrypted_at
+    }
+
+
 def encrypt_field(
     plaintext: Any,
     key_version: Optional[str] = None,
@@ -42,13 +169,7 @@ def encrypt_field(
         data_key = key_store.get_data_key(key_version)
         
         # Prepare plaintext
-        if isinstance(plaintext, bytes):
-            plaintext_bytes = plaintext
-        elif isinstance(plaintext, str):
-            plaintext_bytes = plaintext.encode('utf-8')
-        else:
-            # JSON serialize for complex types
-            plaintext_bytes = json.dumps(plaintext).encode('utf-8')
+        plaintext_bytes = _to_plaintext_bytes(plaintext)
         
         # Prepare associated data for authentication
         aad_dict = {
@@ -56,22 +177,16 @@ def encrypt_field(
             "key_version": key_version,
             **(associated_data or {})
         }
-        aad_bytes = json.dumps(aad_dict, sort_keys=True).encode('utf-8')
+        aad_bytes = _serialize_aad(aad_dict)
         
         # Encrypt with AES-GCM
-        aesgcm = AESGCM(data_key)
-        nonce = os.urandom(12)  # 96-bit nonce for GCM
-        ciphertext = aesgcm.encrypt(nonce, plaintext_bytes, aad_bytes)
+        nonce = _nonce_generator.next_nonce()  # 96-bit nonce for GCM
+        ciphertext = _encrypt_field_raw(AESGCM(data_key), nonce, plaintext_bytes, aad_bytes)
         
         # Return encrypted data package
-        return {
-            "ciphertext": base64.b64encode(ciphertext).decode('utf-8'),
-            "nonce": base64.b64encode(nonce).decode('utf-8'),
-            "key_version": key_version,
-            "algorithm": "AES-256-GCM",
-            "associated_data": aad_dict,
-            "encrypted_at": datetime.utcnow()
-        }
+        return _build_record(
+            nonce, ciphertext, key_version, aad_dict, aad_bytes, datetime.utcnow()
+        )
     
     except Exception as e:
         logger.error(f"Encryption failed: {e}")
@@ -94,8 +209,8 @@ def decrypt_field(
     """
     try:
         # Extract components
-        ciphertext = base64.b64decode(encrypted_data['ciphertext'])
-        nonce = base64.b64decode(encrypted_data['nonce'])
+        ciphertext = _as_bytes(encrypted_data['ciphertext'])
+        nonce = _as_bytes(encrypted_data['nonce'])
         key_version = encrypted_data['key_version']
         associated_data = encrypted_data.get('associated_data', {})
         
@@ -107,8 +222,16 @@ def decrypt_field(
         key_store = get_current_key_store()
         data_key = key_store.get_data_key(key_version)
         
-        # Reconstruct associated data for authentication
-        aad_bytes = json.dumps(associated_data, sort_keys=True).encode('utf-8')
+        # The associated_data dict is the source of truth: stored AAD bytes
+        # are only used if they match what the dict serializes to, so an
+        # edited dict cannot ride on the original authentication tag
+        if 'aad' in encrypted_data:
+            aad_bytes = _as_bytes(encrypted_data['aad'])
+            if aad_bytes not in _aad_candidates(associated_data):
+                raise ValueError("Associated data does not match the authenticated AAD")
+        else:
+            # Older records only carry the dict
+            aad_bytes = _serialize_aad_legacy(associated_data)
         
         # Decrypt with AES-GCM (also verifies authentication tag)
         aesgcm = AESGCM(data_key)
@@ -133,56 +256,104 @@ def decrypt_field(
         raise RuntimeError(f"Field decryption failed: {e}")
 
 
+def _pack_fields(
+    document: Dict[str, Any],
+    fields: Tuple[str, ...]
+) -> Tuple[List[str], List[bytes]]:
+    """
+    Collect the present, non-null fields of a document for encryption
+    
+    Returns:
+        Parallel lists of field names and their plaintext bytes
+    """
+    names = []
+    plaintexts = []
+    for field_name in fields:
+        value = document.get(field_name)
+        if value is not None:
+            names.append(field_name)
+            plaintexts.append(_to_plaintext_bytes(value))
+    return names, plaintexts
+
+
 def encrypt_document_fields(
     document: Dict[str, Any],
-    fields_to_encrypt: list,
-    associated_data: Optional[Dict] = None
+    fields_to_encrypt: Tuple[str, ...],
+    associated_data: Optional[Dict] = None,
+    inplace: bool = False
 ) -> Dict[str, Any]:
     """
     Encrypt specified fields in a document
     
     Args:
         document: Document with fields to encrypt
-        fields_to_encrypt: List of field names to encrypt
+        fields_to_encrypt: Field names to encrypt (e.g. a collection's
+            *_ENCRYPTED_FIELDS tuple)
         associated_data: Additional context for encryption
+        inplace: Modify document itself instead of a copy
     
     Returns:
         Modified document with encrypted fields and metadata
     """
-    encrypted_doc = document.copy()
-    encryption_metadata = {}
-    
-    for field_name in fields_to_encrypt:
-        if field_name in document and document[field_name] is not None:
-            # Add field name to associated data
-            field_aad = {
-                "field_name": field_name,
+    
+    key_store = get_current_key_store()
+    key_version = key_store.get_current_version()
+    timestamp = datetime.utcnow()
+    
+    names, plaintexts = _pack_fields(document, fields_to_encrypt)
+    
+    # Every field is encrypted before the document is touched, so a
+    # failure leaves an in-place document unchanged
+    records = []
+    if names:
+        try:
+            # One key lookup, cipher context and entropy read per document
+            aesgcm = AESGCM(key_store.get_data_key(key_version))
+            base_nonce = int.from_bytes(_nonce_generator.next_nonce(), 'big')
+            
+            # Serialize the shared associated data once per document; each
+            # field only appends its name to these bytes
+            base_aad = {
+                "timestamp": timestamp.isoformat(),
+                "key_version": key_version,
                 **(associated_data or {})
             }
+            base_aad_bytes = _serialize_aad(base_aad)
             
-            # Encrypt field
-            encrypted = encrypt_field(document[field_name], associated_data=field_aad)
-            
-            # Store in special field name
-            encrypted_field_name = f"_encrypted_{field_name}"
-            encrypted_doc[encrypted_field_name] = encrypted
-            
-            # Remove plaintext
-            del encrypted_doc[field_name]
-            
-            # Track metadata
-            encryption_metadata[field_name] = {
-                "encrypted": True,
-                "key_version": encrypted["key_version"],
-                "encrypted_at": encrypted["encrypted_at"]
-            }
+            for index, (field_name, plaintext_bytes) in enumerate(zip(names, plaintexts)):
+                aad_bytes = base_aad_bytes + b"|field_name=" + field_name.encode('utf-8')
+                nonce = _derive_nonce(base_nonce, index)
+                ciphertext = _encrypt_field_raw(aesgcm, nonce, plaintext_bytes, aad_bytes)
+                
+                records.append(_build_record(
+                    nonce, ciphertext, key_version,
+                    {"field_name": field_name, **base_aad}, aad_bytes, timestamp
+                ))
+        except Exception as e:
+            logger.error(f"Encryption failed: {e}")
+            raise RuntimeError(f"Field encryption failed: {e}")
     
-    # Add encryption metadata to document
+    encrypted_doc = document if inplace else document.copy()
+    
+    # Store in special field name and remove plaintext
+    for field_name, record in zip(names, records):
+        encrypted_doc[f"_encrypted_{field_name}"] = record
+        del encrypted_doc[field_name]
+    
+    # Add encryption metadata to document; every field shares the
+    # document's key version and timestamp
     encrypted_doc["_encryption_metadata"] = {
-        "encrypted_fields": list(encryption_metadata.keys()),
-        "field_metadata": encryption_metadata,
+        "encrypted_fields": names,
+        "field_metadata": {
+            field_name: {
+                "encrypted": True,
+                "key_version": key_version,
+                "encrypted_at": timestamp
+            }
+            for field_name in names
+        },
         "encrypted": True,
-        "key_version": get_current_key_store().get_current_version()
+        "key_version": key_version
     }
     
     return encrypted_doc
@@ -190,7 +361,8 @@ def encrypt_document_fields(
 
 def decrypt_document_fields(
     encrypted_document: Dict[str, Any],
-    fields_to_decrypt: Optional[list] = None
+    fields_to_decrypt: Optional[list] = None,
+    inplace: bool = False
 ) -> Dict[str, Any]:
     """
     Decrypt specified fields in an encrypted document
@@ -198,6 +370,7 @@ def decrypt_document_fields(
     Args:
         encrypted_document: Document with encrypted fields
         fields_to_decrypt: List of fields to decrypt (None = all encrypted fields)
+        inplace: Modify encrypted_document itself instead of a copy
     
     Returns:
         Document with decrypted fields
@@ -206,27 +379,31 @@ def decrypt_document_fields(
         # Document not encrypted
         return encrypted_document
     
-    decrypted_doc = encrypted_document.copy()
     metadata = encrypted_document["_encryption_metadata"]
-    encrypted_fields = metadata.get("encrypted_fields", [])
+    encrypted_fields = _encrypted_field_lookup(metadata)
     
     # Determine which fields to decrypt
     if fields_to_decrypt is None:
-        fields_to_decrypt = encrypted_fields
+        fields_to_decrypt = metadata.get("encrypted_fields", [])
     
+    # Decrypt every field first so a failure leaves the document unchanged
+    decrypted_values = []
     for field_name in fields_to_decrypt:
         if field_name in encrypted_fields:
             encrypted_field_name = f"_encrypted_{field_name}"
             
             if encrypted_field_name in encrypted_document:
-                # Decrypt field
-                decrypted_value = decrypt_field(encrypted_document[encrypted_field_name])
-                
-                # Restore to original field name
-                decrypted_doc[field_name] = decrypted_value
-                
-                # Remove encrypted version
-                del decrypted_doc[encrypted_field_name]
+                decrypted_values.append((
+                    field_name,
+                    decrypt_field(encrypted_document[encrypted_field_name])
+                ))
+    
+    decrypted_doc = encrypted_document if inplace else encrypted_document.copy()
+    
+    for field_name, decrypted_value in decrypted_values:
+        # Restore to original field name and remove encrypted version
+        decrypted_doc[field_name] = decrypted_value
+        del decrypted_doc[f"_encrypted_{field_name}"]
     
     return decrypted_doc
 
@@ -254,6 +431,19 @@ def verify_encryption_integrity(encrypted_data: Dict[str, Any]) -> bool:
     return True
 
 
+def _encrypted_field_lookup(metadata: Dict) -> Any:
+    """
+    O(1) membership container for a document's encrypted fields
+    
+    field_metadata is keyed by field name, so it doubles as the lookup;
+    the encrypted_fields list is only used if it is missing.
+    """
+    field_metadata = metadata.get("field_metadata")
+    if field_metadata is not None:
+        return field_metadata
+    return set(metadata.get("encrypted_fields", []))
+
+
 def get_encryption_metadata(encrypted_document: Dict[str, Any]) -> Optional[Dict]:
     """
     Extract encryption metadata from document
@@ -269,4 +459,4 @@ def is_field_encrypted(document: Dict[str, Any], field_name: str) -> bool:
     metadata = get_encryption_metadata(document)
     if metadata is None:
         return False
-    return field_name in metadata.get("encrypted_fields", [])
+    return field_name in _encrypted_field_lookup(metadata)
@@ -5,14 +5,26 @@ Supports KMS (AWS KMS, GCP KMS, HashiCorp Vault) and local file mode
 
 import os
 import json
-import base64
+import hmac
+import ctypes
+import hashlib
+import time
+import queue
 import logging
-from typing import Dict, Optional, Tuple
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 from abc import ABC, abstractmethod
 
 logger = logging.getLogger(__name__)
 
+# SIMD-accelerated base64 for wrapped keys when available (same API)
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
+
 # Environment configuration
 KEY_STORE_MODE = os.getenv('KEY_STORE_MODE', 'local')  # 'kms' or 'local'
 KEY_STORE_PATH = os.getenv('KEY_STORE_PATH', os.path.join(os.path.dirname(__file__), '..', 'keys'))
@@ -20,11 +32,70 @@ KMS_PROVIDER = os.getenv('KMS_PROVIDER', 'aws')  # 'aws', 'gcp', 'vault'
 KMS_KEY_ID = os.getenv('KMS_KEY_ID', '')
 KEY_VERSION = os.getenv('KEY_VERSION', 'v1')
 KEY_ROTATION_DAYS = int(os.getenv('KEY_ROTATION_DAYS', '90'))
+DATA_KEY_CACHE_TTL = int(os.getenv('DATA_KEY_CACHE_TTL', '3600'))  # seconds
+KMS_PREFETCH_SIZE = int(os.getenv('KMS_PREFETCH_SIZE', '2'))  # 0 disables prefetching
+KMS_DECRYPT_TIMEOUT = float(os.getenv('KMS_DECRYPT_TIMEOUT', '10'))  # seconds per unwrap
+
+
+def secure_wipe(buf: bytearray):
+    """
+    Zero a mutable key buffer in place (explicit_bzero equivalent)
+    
+    Only bytearrays can be wiped reliably; immutable bytes may be shared
+    and must not be written to.
+    """
+    if len(buf):
+        ctypes.memset((ctypes.c_char * len(buf)).from_buffer(buf), 0, len(buf))
 
 
 class KeyStore(ABC):
     """Abstract base class for key storage"""
     
+    def __init__(self):
+        # Plaintext data keys by version: (key_buffer, monotonic expiry).
+        # The cache owns the buffers and wipes them when they are dropped.
+        # This only bounds the lifetime of the long-lived cached copy: callers
+        # of get_data_key receive immutable bytes that cannot be wiped.
+        # Reads copy under the same lock as wipes, so a reader never copies
+        # a buffer that is being zeroed.
+        self._key_cache: Dict[str, Tuple[bytearray, float]] = {}
+        self._cache_lock = threading.Lock()
+        self._cache_ttl = DATA_KEY_CACHE_TTL
+    
+    def _get_cached_key(self, key_version: str) -> Optional[bytes]:
+        """Return cached data key if present and not expired"""
+        with self._cache_lock:
+            cached = self._key_cache.get(key_version)
+            if cached is None:
+                return None
+            if time.monotonic() < cached[1]:
+                # Callers get a short-lived copy, never the wipeable buffer
+                return bytes(cached[0])
+            del self._key_cache[key_version]
+            secure_wipe(cached[0])
+            return None
+    
+    def _cache_key(self, key_version: str, data_key: bytearray):
+        """Cache a data key buffer for the configured TTL (takes ownership)"""
+        with self._cache_lock:
+            previous = self._key_cache.get(key_version)
+            self._key_cache[key_version] = (data_key, time.monotonic() + self._cache_ttl)
+            if previous is not None and previous[0] is not data_key:
+                secure_wipe(previous[0])
+    
+    def invalidate(self, key_version: Optional[str] = None):
+        """Drop and wipe a cached data key (all versions if None)"""
+        with self._cache_lock:
+            if key_version is None:
+                cached_keys = list(self._key_cache.values())
+                self._key_cache.clear()
+            else:
+                cached = self._key_cache.pop(key_version, None)
+                cached_keys = [cached] if cached is not None else []
+            
+            for data_key, _ in cached_keys:
+                secure_wipe(data_key)
+    
     @abstractmethod
     def get_data_key(self, key_version: str) -> bytes:
         """Get plaintext data encryption key for given version"""
@@ -55,6 +126,7 @@ class LocalKeyStore(KeyStore):
     """Local file-based key store (DEV/TEST ONLY - NOT FOR PRODUCTION)"""
     
     def __init__(self, key_dir: str):
+        super().__init__()
         self.key_dir = key_dir
         os.makedirs(key_dir, exist_ok=True)
         
@@ -65,6 +137,14 @@ class LocalKeyStore(KeyStore):
             pass
         
         self.metadata_file = os.path.join(key_dir, 'key_metadata.json')
+        # Parsed metadata, valid while the file's mtime is unchanged
+        self._metadata_cache: Optional[Dict] = None
+        self._metadata_mtime = 0
+        
+        # Key generation is serialized per version via a fixed set of
+        # sharded locks; the shared metadata file has its own lock
+        self._locks = [threading.Lock() for _ in range(32)]
+        self._metadata_lock = threading.Lock()
         self._ensure_metadata()
         
         logger.warning("🔓 Using LOCAL key store - FOR DEVELOPMENT ONLY!")
@@ -81,20 +161,41 @@ class LocalKeyStore(KeyStore):
             self._save_metadata(metadata)
     
     def _load_metadata(self) -> Dict:
-        """Load metadata from file"""
+        """Load metadata from file (cached until the file changes)"""
+        mtime = os.stat(self.metadata_file).st_mtime_ns
+        if self._metadata_cache is not None and mtime == self._metadata_mtime:
+            return self._metadata_cache
+        
         with open(self.metadata_file, 'r') as f:
-            return json.load(f)
+            self._metadata_cache = json.load(f)
+        self._metadata_mtime = mtime
+        return self._metadata_cache
     
     def _save_metadata(self, metadata: Dict):
-        """Save metadata to file"""
-        with open(self.metadata_file, 'w') as f:
-            json.dump(metadata, f, indent=2)
-        
-        # Set restrictive permissions
+        """Save metadata to file (atomically replaced via a temp file)"""
+        tmp_file = f"{self.metadata_file}.tmp"
         try:
-            os.chmod(self.metadata_file, 0o600)
-        except:
-            pass
+            with open(tmp_file, 'w') as f:
+                json.dump(metadata, f, indent=2)
+            
+            # Set restrictive permissions
+            try:
+                os.chmod(tmp_file, 0o600)
+            except:
+                pass
+            
+            os.replace(tmp_file, self.metadata_file)
+        except Exception:
+            # Callers may have modified the cached dict before the failed write
+            self._metadata_cache = None
+            raise
+        
+        self._metadata_cache = metadata
+        self._metadata_mtime = os.stat(self.metadata_file).st_mtime_ns
+    
+    def _lock_for(self, key_version: str) -> threading.Lock:
+        """Get the sharded lock for a key version"""
+        return self._locks[hash(key_version) & 31]
     
     def _get_key_path(self, key_version: str) -> str:
         """Get file path for key version"""
@@ -102,23 +203,70 @@ class LocalKeyStore(KeyStore):
     
     def get_data_key(self, key_version: str) -> bytes:
         """Get plaintext data encryption key"""
+        cached = self._get_cached_key(key_version)
+        if cached is not None:
+            return cached
+        
         key_path = self._get_key_path(key_version)
         
-        if not os.path.exists(key_path):
-            # Generate new key
-            from cryptography.hazmat.primitives.ciphers.aead import AESGCM
-            data_key = AESGCM.generate_key(bit_length=256)
+        with self._lock_for(key_version):
+            key_buffer = None
+            if not os.path.exists(key_path):
+                key_buffer = self._create_key_file(key_path, key_version)
             
-            with open(key_path, 'wb') as f:
-                f.write(data_key)
+            if key_buffer is None:
+                # Read straight into a wipeable buffer
+                with open(key_path, 'rb') as f:
+                    key_buffer = bytearray(os.fstat(f.fileno()).st_size)
+                    f.readinto(key_buffer)
+                if len(key_buffer) != 32:  # AES-256
+                    secure_wipe(key_buffer)
+                    raise ValueError(f"Corrupt key file for version {key_version}")
             
-            # Set restrictive permissions
+            # Copy before handing the buffer to the cache, which may wipe it
+            data_key = bytes(key_buffer)
+            self._cache_key(key_version, key_buffer)
+            return data_key
+    
+    def _create_key_file(self, key_path: str, key_version: str) -> Optional[bytearray]:
+        """
+        Generate and persist a new data key
+        
+        The key is written to a private (O_EXCL, mode 0600) temp file and
+        then published with os.link, which fails if the key file already
+        exists. Readers therefore only ever see a complete key, and a
+        concurrent creator cannot be overwritten. Returns None if another
+        process created it first.
+        """
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+        key_buffer = bytearray(AESGCM.generate_key(bit_length=256))
+        
+        tmp_path = f'{key_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        flags = os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, 'O_BINARY', 0)
+        try:
+            os.unlink(tmp_path)  # left over from a crashed process with our pid
+        except FileNotFoundError:
+            pass
+        
+        try:
+            fd = os.open(tmp_path, flags, 0o600)
             try:
-                os.chmod(key_path, 0o600)
-            except:
+                os.write(fd, key_buffer)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            os.link(tmp_path, key_path)
+        except FileExistsError:
+            secure_wipe(key_buffer)
+            return None
+        finally:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
                 pass
-            
-            # Update metadata
+        
+        # Update metadata
+        with self._metadata_lock:
             metadata = self._load_metadata()
             metadata['keys'][key_version] = {
                 "created_at": datetime.utcnow().isoformat(),
@@ -126,11 +274,9 @@ class LocalKeyStore(KeyStore):
                 "status": "active"
             }
             self._save_metadata(metadata)
-            
-            logger.info(f"Generated new data key for version {key_version}")
         
-        with open(key_path, 'rb') as f:
-            return f.read()
+        logger.info(f"Generated new data key for version {key_version}")
+        return key_buffer
     
     def wrap_data_key(self, plaintext_key: bytes, key_version: str) -> str:
         """In local mode, just base64 encode (no real wrapping)"""
@@ -143,22 +289,25 @@ class LocalKeyStore(KeyStore):
     
     def rotate_key(self) -> str:
         """Generate new key version"""
-        metadata = self._load_metadata()
-        
-        # Generate new version ID
-        current_num = int(metadata['current_version'].replace('v', ''))
-        new_version = f'v{current_num + 1}'
-        
-        # Mark old key as deprecated
-        old_version = metadata['current_version']
-        if old_version in metadata['keys']:
-            metadata['keys'][old_version]['status'] = 'deprecated'
-            metadata['keys'][old_version]['deprecated_at'] = datetime.utcnow().isoformat()
+        with self._metadata_lock:
+            metadata = self._load_metadata()
+            
+            # Generate new version ID
+            current_num = int(metadata['current_version'].replace('v', ''))
+            new_version = f'v{current_num + 1}'
+            
+            # Mark old key as deprecated
+            old_version = metadata['current_version']
+            if old_version in metadata['keys']:
+                metadata['keys'][old_version]['status'] = 'deprecated'
+                metadata['keys'][old_version]['deprecated_at'] = datetime.utcnow().isoformat()
+            
+            # Update current version
+            metadata['current_version'] = new_version
+            metadata['last_rotation'] = datetime.utcnow().isoformat()
+            self._save_metadata(metadata)
         
-        # Update current version
-        metadata['current_version'] = new_version
-        metadata['last_rotation'] = datetime.utcnow().isoformat()
-        self._save_metadata(metadata)
+        self.invalidate(old_version)
         
         # Generate new key (will be created on first access)
         logger.info(f"Key rotated: {old_version} -> {new_version}")
@@ -171,10 +320,187 @@ class LocalKeyStore(KeyStore):
         return metadata['current_version']
 
 
+class _BatchDecryptQueue:
+    """
+    Coalesces concurrent KMS decrypt requests
+    
+    A background thread drains queued (wrapped_key, Future) pairs every
+    few milliseconds (or once max_batch are waiting), collapses duplicate
+    wrapped keys, and issues the KMS calls in parallel.
+    """
+    
+    def __init__(
+        self,
+        decrypt: Callable[[str], bytes],
+        max_batch: int = 10,
+        max_wait: float = 0.005,
+        max_workers: int = 16
+    ):
+        self._decrypt = decrypt
+        self._max_batch = max_batch
+        self._max_wait = max_wait
+        self._max_workers = max_workers
+        self._reset()
+        
+        # Neither the drain thread nor the executor's workers survive a fork
+        # (e.g. a gunicorn worker), so the child starts from fresh state
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset)
+    
+    def _reset(self):
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix='kms-decrypt')
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+    
+    def submit(self, wrapped_key: str) -> Future:
+        """Queue a wrapped key for decryption"""
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='kms-batch-decrypt', daemon=True)
+                    self._thread.start()
+        
+        future: Future = Future()
+        self._queue.put((wrapped_key, future))
+        return future
+    
+    def _drain(self) -> List[Tuple[str, Future]]:
+        """Block for the first request, then collect a batch"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self._max_wait
+        while len(batch) < self._max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+    
+    def _run(self):
+        while True:
+            waiters: Dict[str, List[Future]] = {}
+            for wrapped_key, future in self._drain():
+                if future.set_running_or_notify_cancel():
+                    waiters.setdefault(wrapped_key, []).append(future)
+            
+            for wrapped_key, futures in waiters.items():
+                self._executor.submit(self._resolve, wrapped_key, futures)
+    
+    def _resolve(self, wrapped_key: str, futures: List[Future]):
+        try:
+            plaintext = self._decrypt(wrapped_key)
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+        else:
+            for future in futures:
+                future.set_result(plaintext)
+
+
+class _DataKeyPrefetcher:
+    """
+    Keeps a few freshly generated KMS data keys ready for use
+    
+    A background thread fills a bounded queue with (plaintext buffer,
+    KMS ciphertext blob) pairs so a cache miss does not wait on a KMS round
+    trip. Keys older than max_age are wiped and skipped; if none is ready
+    the caller generates one synchronously.
+    """
+    
+    def __init__(self, generate: Callable[[], Tuple[bytes, bytes]], size: int, max_age: float):
+        self._generate = generate
+        self._size = size
+        self._max_age = max_age
+        self._queue: "queue.Queue[Tuple[bytearray, bytes, float]]" = queue.Queue(maxsize=size)
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+        
+        # The thread does not survive a fork (e.g. gunicorn preloading after
+        # warm_key_store ran in the master): restart lazily on both sides
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(
+                after_in_parent=self._after_fork_in_parent,
+                after_in_child=self._after_fork_in_child
+            )
+    
+    def _start(self):
+        # Started lazily so the thread only runs in a process that serves keys
+        with self._start_lock:
+            if self._thread is None:
+                self._stop = threading.Event()
+                self._thread = threading.Thread(
+                    target=self._run, args=(self._queue, self._stop), name='kms-prefetch', daemon=True
+                )
+                self._thread.start()
+    
+    def _after_fork_in_parent(self):
+        # A forking master usually stops serving: stop prefetching and wipe
+        # its keys; the next get() restarts the thread if it still serves
+        with self._start_lock:
+            self._stop.set()
+            self._thread = None
+            stale, self._queue = self._queue, queue.Queue(maxsize=self._size)
+        while True:
+            try:
+                data_key, _, _ = stale.get_nowait()
+            except queue.Empty:
+                break
+            secure_wipe(data_key)
+    
+    def _after_fork_in_child(self):
+        # The inherited thread does not exist here and may have held the old
+        # locks at fork time, so start from fresh state
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._queue = queue.Queue(maxsize=self._size)
+    
+    def _run(self, key_queue: "queue.Queue[Tuple[bytearray, bytes, float]]", stop: threading.Event):
+        failures = 0
+        while not stop.is_set():
+            try:
+                plaintext, ciphertext_blob = self._generate()
+                data_key = bytearray(plaintext)
+            except Exception as e:
+                failures += 1
+                delay = min(30.0, 0.5 * (2 ** failures))
+                logger.warning(f"KMS data key prefetch failed ({e}), retrying in {delay:.1f}s")
+                stop.wait(delay)
+                continue
+            failures = 0
+            while not stop.is_set():
+                try:
+                    key_queue.put((data_key, ciphertext_blob, time.monotonic()), timeout=1.0)
+                    break
+                except queue.Full:
+                    continue
+            else:
+                secure_wipe(data_key)
+    
+    def get(self) -> Optional[Tuple[bytearray, bytes]]:
+        """Pop a fresh (key buffer, ciphertext blob) pair, or None if none is ready"""
+        if self._thread is None:
+            self._start()
+        
+        while True:
+            try:
+                data_key, ciphertext_blob, generated_at = self._queue.get_nowait()
+            except queue.Empty:
+                return None
+            if time.monotonic() - generated_at <= self._max_age:
+                return data_key, ciphertext_blob
+            secure_wipe(data_key)
+
+
 class AWSKMSKeyStore(KeyStore):
     """AWS KMS-based key store (PRODUCTION)"""
     
     def __init__(self, kms_key_id: str, region: str = None):
+        super().__init__()
         self.kms_key_id = kms_key_id
         self.region = region or os.getenv('AWS_REGION', 'us-east-1')
         
@@ -186,21 +512,53 @@ class AWSKMSKeyStore(KeyStore):
             raise RuntimeError("boto3 required for AWS KMS. Install: pip install boto3")
         except Exception as e:
             raise RuntimeError(f"Failed to initialize AWS KMS: {e}")
+        
+        # KMS ciphertext blob for the data key generated under each version,
+        # with the key's SHA-256 so wrap_data_key can tell it is the same key
+        self._wrapped_keys: Dict[str, Tuple[bytes, bytes]] = {}
+        self._decrypt_queue = _BatchDecryptQueue(self._kms_decrypt)
+        self._prefetcher = (
+            _DataKeyPrefetcher(self._kms_generate_data_key, KMS_PREFETCH_SIZE, self._cache_ttl)
+            if KMS_PREFETCH_SIZE > 0 else None
+        )
+    
+    def _kms_generate_data_key(self) -> Tuple[bytes, bytes]:
+        """Single KMS generate_data_key call: (plaintext, ciphertext blob)"""
+        response = self.kms_client.generate_data_key(
+            KeyId=self.kms_key_id,
+            KeySpec='AES_256'
+        )
+        return response['Plaintext'], response['CiphertextBlob']
     
     def get_data_key(self, key_version: str) -> bytes:
         """Generate data encryption key using KMS"""
-        try:
-            response = self.kms_client.generate_data_key(
-                KeyId=self.kms_key_id,
-                KeySpec='AES_256'
-            )
-            return response['Plaintext']
-        except Exception as e:
-            logger.error(f"KMS generate_data_key failed: {e}")
-            raise
+        cached = self._get_cached_key(key_version)
+        if cached is not None:
+            return cached
+        
+        generated = self._prefetcher.get() if self._prefetcher is not None else None
+        if generated is None:
+            try:
+                plaintext, ciphertext_blob = self._kms_generate_data_key()
+            except Exception as e:
+                logger.error(f"KMS generate_data_key failed: {e}")
+                raise
+            generated = bytearray(plaintext), ciphertext_blob
+        data_key, ciphertext_blob = generated
+        
+        # Copy before handing the buffer to the cache, which may wipe it
+        key_copy = bytes(data_key)
+        self._wrapped_keys[key_version] = (hashlib.sha256(key_copy).digest(), ciphertext_blob)
+        self._cache_key(key_version, data_key)
+        return key_copy
     
     def wrap_data_key(self, plaintext_key: bytes, key_version: str) -> str:
         """Encrypt data key with KMS master key"""
+        # Keys from get_data_key were already wrapped by generate_data_key
+        wrapped = self._wrapped_keys.get(key_version)
+        if wrapped is not None and hmac.compare_digest(wrapped[0], hashlib.sha256(plaintext_key).digest()):
+            return base64.b64encode(wrapped[1]).decode('utf-8')
+        
         try:
             response = self.kms_client.encrypt(
                 KeyId=self.kms_key_id,
@@ -211,15 +569,21 @@ class AWSKMSKeyStore(KeyStore):
             logger.error(f"KMS encrypt failed: {e}")
             raise
     
+    def _kms_decrypt(self, wrapped_key: str) -> bytes:
+        """Single KMS decrypt call (run by the batch decrypt queue)"""
+        ciphertext_blob = base64.b64decode(wrapped_key)
+        response = self.kms_client.decrypt(
+            CiphertextBlob=ciphertext_blob
+        )
+        return response['Plaintext']
+    
     def unwrap_data_key(self, wrapped_key: str, key_version: str) -> bytes:
-        """Decrypt data key using KMS"""
+        """Decrypt data key using KMS (coalesced with concurrent requests)"""
+        future = self._decrypt_queue.submit(wrapped_key)
         try:
-            ciphertext_blob = base64.b64decode(wrapped_key)
-            response = self.kms_client.decrypt(
-                CiphertextBlob=ciphertext_blob
-            )
-            return response['Plaintext']
+            return future.result(timeout=KMS_DECRYPT_TIMEOUT)
         except Exception as e:
+            future.cancel()
             logger.error(f"KMS decrypt failed: {e}")
             raise
     
@@ -244,6 +608,7 @@ class GCPKMSKeyStore(KeyStore):
     """GCP KMS-based key store (PRODUCTION)"""
     
     def __init__(self, key_name: str):
+        super().__init__()
         self.key_name = key_name
         
         try:
@@ -330,3 +695,51 @@ def get_current_key_store() -> KeyStore:
     if _key_store is None:
         return init_key_store()
     return _key_store
+
+
+def _get_data_key_with_retry(store: KeyStore, key_version: str, attempts: int = 3, backoff: float = 0.5) -> bytes:
+    """Fetch a data key, retrying with exponential backoff (e.g. KMS throttling)"""
+    for attempt in range(attempts):
+        try:
+            return store.get_data_key(key_version)
+        except Exception as e:
+            if attempt == attempts - 1:
+                raise
+            delay = backoff * (2 ** attempt)
+            logger.warning(f"Data key fetch for {key_version} failed ({e}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def warm_key_store(versions: Optional[List[str]] = None, max_workers: int = 4) -> KeyStore:
+    """
+    Initialize the key store and load data keys into its cache at startup
+    
+    Keys are fetched concurrently so the first requests don't pay the
+    key store / KMS round trips.
+    
+    Args:
+        versions: Key versions to load (defaults to current and previous)
+        max_workers: Number of concurrent key fetches
+    """
+    store = init_key_store()
+    
+    if versions is None:
+        current = store.get_current_version()
+        versions = [current]
+        if current.startswith('v') and current[1:].isdigit() and int(current[1:]) > 1:
+            versions.append(f'v{int(current[1:]) - 1}')
+    
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='key-warmup') as executor:
+        futures = {
+            version: executor.submit(_get_data_key_with_retry, store, version)
+            for version in versions
+        }
+    
+    for version, future in futures.items():
+        try:
+            future.result()
+        except Exception as e:
+            logger.error(f"Failed to warm data key {version}: {e}")
+    
+    logger.info(f"Key store warmed: {', '.join(versions)}")
+    return store
@@ -5,10 +5,12 @@ Defines roles, permissions, and authorization middleware
 
 import os
 import jwt
+import copy
+import time
 import logging
 from typing import List, Optional, Dict, Set
-from datetime import datetime, timedelta
-from functools import wraps
+from functools import lru_cache, reduce, wraps
+from operator import or_
 from flask import request, jsonify, g
 
 logger = logging.getLogger(__name__)
@@ -17,6 +19,11 @@ logger = logging.getLogger(__name__)
 JWT_SECRET = os.getenv('JWT_SECRET', 'your-secret-key-CHANGE-IN-PRODUCTION')
 JWT_ALGORITHM = os.getenv('JWT_ALGORITHM', 'HS256')
 JWT_EXPIRATION_HOURS = int(os.getenv('JWT_EXPIRATION_HOURS', '24'))
+_JWT_EXPIRATION_SECONDS = JWT_EXPIRATION_HOURS * 3600
+# Secret as bytes so PyJWT does not re-encode it on every sign/verify
+_JWT_KEY = JWT_SECRET.encode('utf-8')
+JWT_CACHE_SIZE = int(os.getenv('JWT_CACHE_SIZE', '4096'))
+JWT_CACHE_CLEAR_SECONDS = int(os.getenv('JWT_CACHE_CLEAR_SECONDS', '600'))
 
 # Role Definitions
 class Role:
@@ -44,9 +51,24 @@ class Role:
     @classmethod
     def has_permission(cls, user_role: str, required_role: str) -> bool:
         """Check if user_role has permissions of required_role"""
+        if user_role in _ROLE_MASK and required_role in _ROLE_BIT:
+            return bool(_ROLE_MASK[user_role] & _ROLE_BIT[required_role])
         return required_role in cls.get_effective_roles(user_role)
 
 
+# Bit per role, and per-role mask of the roles it can act as (from HIERARCHY)
+_ROLE_BIT = {Role.READER: 1, Role.ANALYST: 2, Role.ADMIN: 4, Role.SYSTEM: 8}
+_ROLE_MASK = {
+    role: reduce(or_, (_ROLE_BIT[r] for r in effective), 0)
+    for role, effective in Role.HIERARCHY.items()
+}
+
+
+def _roles_mask(roles: List[str], table: Dict[str, int]) -> int:
+    """OR together the table bits of the given roles (unknown roles add nothing)"""
+    return reduce(or_, (table.get(role, 0) for role in roles), 0)
+
+
 # Permission Definitions per Role
 PERMISSIONS = {
     Role.READER: {
@@ -95,36 +117,56 @@ PERMISSIONS = {
 }
 
 
+# Names of the permissions each role is granted
+_GRANTED = {
+    role: frozenset(name for name, granted in perms.items() if granted)
+    for role, perms in PERMISSIONS.items()
+}
+
+
+@lru_cache(maxsize=256)
+def _granted_for_roles(user_roles: tuple) -> frozenset:
+    """Union of the permissions granted to a combination of roles"""
+    return frozenset().union(*(_GRANTED[role] for role in user_roles if role in _GRANTED))
+
+
 def check_permission(user_roles: List[str], permission: str) -> bool:
     """Check if user has a specific permission"""
-    for role in user_roles:
-        if role in PERMISSIONS:
-            if PERMISSIONS[role].get(permission, False):
-                return True
-    return False
+    return permission in _granted_for_roles(tuple(user_roles))
+
+
+# Fields each role is allowed to see in responses
+_FIELD_PERMISSIONS = {
+    Role.READER: frozenset({
+        "id", "user_id", "consent_id", "timestamp", "created_at",
+        "anonymized_answer", "score", "feedback", "status"
+    }),
+    Role.ANALYST: frozenset({
+        "id", "user_id", "consent_id", "timestamp", "created_at",
+        "anonymized_answer", "redacted_text", "tokens", "analysis",
+        "score", "feedback", "facial_analysis", "status"
+    }),
+    Role.ADMIN: frozenset({
+        "*"  # All fields including encrypted
+    }),
+    Role.SYSTEM: frozenset({
+        "*"  # All fields
+    })
+}
+
+# Roles whose allow-set is the "*" wildcard
+_ROLE_SEES_ALL = {role: "*" in fields for role, fields in _FIELD_PERMISSIONS.items()}
+_ADMIN_LIKE = frozenset(role for role, sees_all in _ROLE_SEES_ALL.items() if sees_all)
+
+_REDACTED_SENTINEL = "[REDACTED - Insufficient permissions]"
+
+# Rank used to pick a user's highest role (unknown roles rank as reader)
+_ROLE_RANK = {Role.READER: 0, Role.ANALYST: 1, Role.ADMIN: 2, Role.SYSTEM: 3}
 
 
 def get_allowed_fields_for_role(role: str) -> Set[str]:
     """Get fields a role is allowed to access"""
-    field_permissions = {
-        Role.READER: {
-            "id", "user_id", "consent_id", "timestamp", "created_at",
-            "anonymized_answer", "score", "feedback", "status"
-        },
-        Role.ANALYST: {
-            "id", "user_id", "consent_id", "timestamp", "created_at",
-            "anonymized_answer", "redacted_text", "tokens", "analysis",
-            "score", "feedback", "facial_analysis", "status"
-        },
-        Role.ADMIN: {
-            "*"  # All fields including encrypted
-        },
-        Role.SYSTEM: {
-            "*"  # All fields
-        }
-    }
-    
-    return field_permissions.get(role, set())
+    return _FIELD_PERMISSIONS.get(role, frozenset())
 
 
 def generate_jwt_token(user_id: str, roles: List[str], scopes: Optional[List[str]] = None) -> str:
@@ -139,21 +181,35 @@ def generate_jwt_token(user_id: str, roles: List[str], scopes: Optional[List[str
     Returns:
         JWT token string
     """
-    now = datetime.utcnow()
+    now = int(time.time())
     payload = {
         "sub": user_id,
         "roles": roles,
         "scopes": scopes or [],
         "iat": now,
-        "exp": now + timedelta(hours=JWT_EXPIRATION_HOURS),
+        "exp": now + _JWT_EXPIRATION_SECONDS,
         "iss": "ai-interview-bot",
         "type": "access"
     }
     
-    token = jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+    token = jwt.encode(payload, _JWT_KEY, algorithm=JWT_ALGORITHM)
     return token
 
 
+@lru_cache(maxsize=JWT_CACHE_SIZE)
+def _verify_jwt_cached(token: str) -> Dict:
+    """
+    Signature-verify and decode a token (cached per token string)
+    
+    Invalid tokens raise, and lru_cache does not cache exceptions, so
+    garbage tokens cannot evict valid entries.
+    """
+    return jwt.decode(token, _JWT_KEY, algorithms=[JWT_ALGORITHM])
+
+
+_jwt_cache_cleared_at = time.monotonic()
+
+
 def verify_jwt_token(token: str) -> Optional[Dict]:
     """
     Verify and decode JWT token
@@ -161,30 +217,42 @@ def verify_jwt_token(token: str) -> Optional[Dict]:
     Returns:
         Decoded token payload or None if invalid
     """
-    try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        
-        # Check expiration
-        if payload.get('exp') and datetime.fromtimestamp(payload['exp']) < datetime.utcnow():
-            logger.warning("Token expired")
-            return None
-        
-        return payload
+    global _jwt_cache_cleared_at
     
+    # Periodically drop cached payloads to bound memory held by old tokens
+    now = time.monotonic()
+    if now - _jwt_cache_cleared_at > JWT_CACHE_CLEAR_SECONDS:
+        _verify_jwt_cached.cache_clear()
+        _jwt_cache_cleared_at = now
+    
+    try:
+        payload = _verify_jwt_cached(token)
     except jwt.ExpiredSignatureError:
         logger.warning("Token expired")
         return None
     except jwt.InvalidTokenError as e:
         logger.warning(f"Invalid token: {e}")
         return None
+    
+    # Check expiration (cached payloads outlive the decode-time check)
+    if payload.get('exp') and payload['exp'] < time.time():
+        logger.warning("Token expired")
+        return None
+    
+    # Deep copy: callers may mutate nested claims such as the roles list
+    return copy.deepcopy(payload)
+
+
+_BEARER = 'Bearer '
+_BEARER_LEN = len(_BEARER)
 
 
 def extract_token_from_request() -> Optional[str]:
     """Extract JWT token from request headers"""
-    auth_header = request.headers.get('Authorization', '')
+    auth_header = request.headers.get('Authorization')
     
-    if auth_header.startswith('Bearer '):
-        return auth_header[7:]  # Remove 'Bearer ' prefix
+    if auth_header and auth_header[:_BEARER_LEN] == _BEARER:
+        return auth_header[_BEARER_LEN:]  # Remove 'Bearer ' prefix
     
     return None
 
@@ -194,6 +262,52 @@ def get_current_user() -> Optional[Dict]:
     return getattr(g, 'current_user', None)
 
 
+def _authenticate_request(required_roles: Optional[List[str]] = None):
+    """
+    Authenticate the current request and store the user in the request context
+    
+    Returns:
+        Error response tuple, or None if the request may proceed
+    """
+    # Extract token
+    token = extract_token_from_request()
+    
+    if not token:
+        return jsonify({"error": "No authentication token provided"}), 401
+    
+    # Verify token
+    payload = verify_jwt_token(token)
+    
+    if not payload:
+        return jsonify({"error": "Invalid or expired token"}), 401
+    
+    # Store user in request context
+    g.current_user = {
+        "user_id": payload.get('sub'),
+        "roles": payload.get('roles', []),
+        "scopes": payload.get('scopes', [])
+    }
+    
+    # Check role permissions
+    if required_roles:
+        user_roles = g.current_user['roles']
+        
+        # Roles outside the hierarchy only match themselves
+        has_required_role = bool(
+            _roles_mask(user_roles, _ROLE_MASK) & _roles_mask(required_roles, _ROLE_BIT)
+        ) or not set(user_roles).isdisjoint(required_roles)
+        
+        if not has_required_role:
+            logger.warning(f"User {g.current_user['user_id']} attempted to access {request.path} without required roles: {required_roles}")
+            return jsonify({
+                "error": "Insufficient permissions",
+                "required_roles": required_roles,
+                "your_roles": user_roles
+            }), 403
+    
+    return None
+
+
 def require_auth(required_roles: Optional[List[str]] = None):
     """
     Decorator to require authentication
@@ -204,45 +318,9 @@ def require_auth(required_roles: Optional[List[str]] = None):
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            # Extract token
-            token = extract_token_from_request()
-            
-            if not token:
-                return jsonify({"error": "No authentication token provided"}), 401
-            
-            # Verify token
-            payload = verify_jwt_token(token)
-            
-            if not payload:
-                return jsonify({"error": "Invalid or expired token"}), 401
-            
-            # Store user in request context
-            g.current_user = {
-                "user_id": payload.get('sub'),
-                "roles": payload.get('roles', []),
-                "scopes": payload.get('scopes', [])
-            }
-            
-            # Check role permissions
-            if required_roles:
-                user_roles = g.current_user['roles']
-                has_required_role = False
-                
-                for user_role in user_roles:
-                    for required_role in required_roles:
-                        if Role.has_permission(user_role, required_role):
-                            has_required_role = True
-                            break
-                    if has_required_role:
-                        break
-                
-                if not has_required_role:
-                    logger.warning(f"User {g.current_user['user_id']} attempted to access {request.path} without required roles: {required_roles}")
-                    return jsonify({
-                        "error": "Insufficient permissions",
-                        "required_roles": required_roles,
-                        "your_roles": user_roles
-                    }), 403
+            error = _authenticate_request(required_roles)
+            if error is not None:
+                return error
             
             return f(*args, **kwargs)
         
@@ -254,19 +332,21 @@ def require_permission(permission: str):
     """
     Decorator to require specific permission
     
+    Authentication runs in the same wrapper rather than a nested
+    require_auth() wrapper, so a guarded call adds a single frame.
+    
     Args:
         permission: Permission name (e.g., 'decrypt_fields')
     """
     def decorator(f):
         @wraps(f)
-        @require_auth()
         def decorated_function(*args, **kwargs):
-            user = get_current_user()
+            error = _authenticate_request()
+            if error is not None:
+                return error
             
-            if not user:
-                return jsonify({"error": "Authentication required"}), 401
-            
-            user_roles = user.get('roles', [])
+            user = g.current_user
+            user_roles = user['roles']
             
             if not check_permission(user_roles, permission):
                 logger.warning(f"User {user['user_id']} lacks permission '{permission}' for {request.path}")
@@ -285,35 +365,24 @@ def filter_response_by_role(data: Dict, user_roles: List[str]) -> Dict:
     """
     Filter response data based on user roles
     
-    Removes fields user is not allowed to see
+    Redacts fields user is not allowed to see (modifies data in place)
     """
+    # If admin/system, return everything
+    if not _ADMIN_LIKE.isdisjoint(user_roles):
+        return data
+    
     # Find highest role
-    highest_role = Role.READER
-    for role in user_roles:
-        if role == Role.SYSTEM:
-            highest_role = Role.SYSTEM
-            break
-        elif role == Role.ADMIN:
-            highest_role = Role.ADMIN
-        elif role == Role.ANALYST and highest_role == Role.READER:
-            highest_role = Role.ANALYST
+    known_roles = [role for role in user_roles if role in _ROLE_RANK]
+    highest_role = max(known_roles, key=_ROLE_RANK.__getitem__, default=Role.READER)
     
     allowed_fields = get_allowed_fields_for_role(highest_role)
     
-    # If admin/system, return everything
-    if "*" in allowed_fields:
-        return data
-    
-    # Filter fields
-    filtered = {}
-    for key, value in data.items():
-        if key in allowed_fields or key.startswith('_'):  # Allow metadata fields
-            filtered[key] = value
-        else:
-            # Mark as redacted
-            filtered[key] = "[REDACTED - Insufficient permissions]"
+    # Mark disallowed fields as redacted; metadata fields are allowed
+    for key in data.keys() - allowed_fields:
+        if not key.startswith('_'):
+            data[key] = _REDACTED_SENTINEL
     
-    return filtered
+    return data
 
 
 def create_service_token(service_name: str, roles: Optional[List[str]] = None) -> str:
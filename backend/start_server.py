@@ -6,6 +6,49 @@ Simple startup script for the Flask server with better error handling.
 import os
 import sys
 
+# Production server settings (gunicorn is used when installed, e.g. not on Windows)
+USE_DEV_SERVER = os.environ.get('USE_DEV_SERVER', '').lower() in ('1', 'true', 'yes')
+# One worker by default: each worker loads its own whisper model, and the JSON
+# fallback store is not safe for concurrent writers across processes. Raise
+# it only with MongoDB available and memory for one model per worker.
+GUNICORN_WORKERS = int(os.environ.get('GUNICORN_WORKERS', 1))
+GUNICORN_THREADS = int(os.environ.get('GUNICORN_THREADS', 8))
+
+def run_gunicorn(app, port):
+    """
+    Serve the already-imported app with gunicorn (prefork, threaded workers)
+    
+    The app is loaded in this process before forking (the equivalent of
+    --preload), so workers share the key store and module-level tables.
+    Returns False if gunicorn is not available.
+    """
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        return False
+    
+    def post_fork(server, worker):
+        # The MongoClient opened while importing the app is not fork-safe
+        import app as app_module
+        app_module.reconnect_mongo_after_fork()
+    
+    class PreloadedApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f'0.0.0.0:{port}')
+            self.cfg.set('workers', GUNICORN_WORKERS)
+            self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('threads', GUNICORN_THREADS)
+            self.cfg.set('preload_app', True)
+            self.cfg.set('post_fork', post_fork)
+        
+        def load(self):
+            return app
+    
+    print(f"Using gunicorn: {GUNICORN_WORKERS} workers x {GUNICORN_THREADS} threads")
+    print("Debug mode and auto-reload are off; set USE_DEV_SERVER=1 for the Flask dev server")
+    PreloadedApplication().run()
+    return True
+
 def main():
     print("Starting AI Interview Bot Backend Server...")
     print(f"Current directory: {os.getcwd()}")
@@ -26,9 +69,20 @@ def main():
         print("Press Ctrl+C to stop the server")
         print("-" * 50)
         
+        # Load encryption keys before the first request needs them
+        try:
+            from security import warm_key_store
+            warm_key_store()
+            print("Encryption keys loaded")
+        except Exception as e:
+            print(f"Warning: could not preload encryption keys: {e}")
+        
         # Start the server
         port = int(os.environ.get('PORT', 5001))
-        app.run(debug=True, port=port, host='0.0.0.0')
+        if USE_DEV_SERVER or not run_gunicorn(app, port):
+            if not USE_DEV_SERVER:
+                print("gunicorn not available, using the Flask dev server")
+            app.run(debug=True, port=port, host='0.0.0.0')
         
     except ImportError as e:
         print(f"Import error: {e}")
@@ -8,35 +8,38 @@ import time
 import subprocess
 import sys
 import threading
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+ENDPOINTS = [
+    ("root", "/"),
+    ("status", "/api/status"),
+    ("health", "/api/health"),
+]
 
 def test_endpoints():
-    """Test the server endpoints"""
+    """Test the server endpoints (concurrently, over one pooled session)"""
     base_url = "http://localhost:5001"
     
     # Wait a moment for server to start
     time.sleep(2)
     
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10)
+    session.mount('http://', adapter)
+    
     try:
-        # Test root endpoint
-        print("Testing root endpoint...")
-        response = requests.get(f"{base_url}/")
-        print(f"Root endpoint status: {response.status_code}")
-        if response.status_code == 200:
-            print(f"Response: {response.json()}")
-        
-        # Test status endpoint
-        print("\nTesting status endpoint...")
-        response = requests.get(f"{base_url}/api/status")
-        print(f"Status endpoint status: {response.status_code}")
-        if response.status_code == 200:
-            print(f"Response: {response.json()}")
+        print("Testing endpoints: " + ", ".join(name for name, _ in ENDPOINTS) + "...")
+        with ThreadPoolExecutor(max_workers=len(ENDPOINTS)) as executor:
+            responses = list(executor.map(
+                lambda endpoint: session.get(f"{base_url}{endpoint[1]}"),
+                ENDPOINTS
+            ))
         
-        # Test health endpoint
-        print("\nTesting health endpoint...")
-        response = requests.get(f"{base_url}/api/health")
-        print(f"Health endpoint status: {response.status_code}")
-        if response.status_code == 200:
-            print(f"Response: {response.json()}")
+        for (name, _), response in zip(ENDPOINTS, responses):
+            print(f"\n{name.capitalize()} endpoint status: {response.status_code}")
+            if response.status_code == 200:
+                print(f"Response: {response.json()}")
             
         print("\n✅ All endpoints are working correctly!")
         
@@ -44,6 +47,8 @@ def test_endpoints():
         print("❌ Could not connect to server. Make sure the Flask server is running on port 5001")
     except Exception as e:
         print(f"❌ Error testing endpoints: {e}")
+    finally:
+        session.close()
 
 if __name__ == "__main__":
     # Check if requests is available
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import backend modules (e.g. `security`) the way the server does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,115 @@
+"""
+Audit log hash chain tests (mongomock-backed)
+"""
+
+import hashlib
+from datetime import datetime, timedelta
+
+import mongomock
+import pytest
+
+from security.audit_logger import AuditLogger, verify_merkle_proof
+
+
+def _legacy_hash(timestamp, actor_id, action, target_id, prev_hex):
+    """Entry hash as written before chain sharding (hex digest)"""
+    hash_input = f"{timestamp.isoformat()}{actor_id}{action}{target_id}{prev_hex or ''}"
+    return hashlib.sha256(hash_input.encode('utf-8')).hexdigest()
+
+
+def _insert_legacy_chain(collection, actors):
+    """One global chain: each prev_hash is the previous entry from any actor"""
+    start = datetime(2024, 1, 1, 12, 0, 0, 1000)
+    prev_hex = None
+    for index, actor_id in enumerate(actors):
+        timestamp = start + timedelta(seconds=index)
+        entry_hash = _legacy_hash(timestamp, actor_id, "read", "doc", prev_hex)
+        collection.insert_one({
+            "actor_id": actor_id,
+            "action": "read",
+            "target_id": "doc",
+            "timestamp": timestamp,
+            "entry_hash": entry_hash,
+            "prev_hash": prev_hex
+        })
+        prev_hex = entry_hash
+
+
+@pytest.fixture
+def db():
+    return mongomock.MongoClient()["interview_db"]
+
+
+def test_legacy_global_chain_verifies(db):
+    _insert_legacy_chain(db.access_audit_logs, ["a", "b", "a"])
+    assert AuditLogger(db).verify_chain_integrity()
+
+
+def test_mixed_legacy_and_sharded_entries_verify(db):
+    _insert_legacy_chain(db.access_audit_logs, ["a", "b", "a"])
+    audit = AuditLogger(db)
+    for actor_id in ["a", "b", "a", "c"]:
+        audit.log("read", actor_id=actor_id, target_id="doc")
+
+    # Sharded chains start fresh after the legacy chain
+    first_a = db.access_audit_logs.find_one({"actor_id": "a", "hash_version": {"$exists": True}})
+    assert first_a["prev_hash"] is None
+
+    assert audit.verify_chain_integrity()
+    assert AuditLogger(db).verify_chain_integrity()
+
+
+def test_tampered_legacy_entry_fails(db):
+    _insert_legacy_chain(db.access_audit_logs, ["a", "b", "a"])
+    audit = AuditLogger(db)
+    audit.log("read", actor_id="a", target_id="doc")
+
+    db.access_audit_logs.update_one({"actor_id": "b"}, {"$set": {"action": "delete"}})
+    assert not audit.verify_chain_integrity()
+
+
+def test_tampered_sharded_entry_fails(db):
+    _insert_legacy_chain(db.access_audit_logs, ["a", "b"])
+    audit = AuditLogger(db)
+    audit.log("read", actor_id="a", target_id="doc")
+    audit.log("read", actor_id="a", target_id="doc")
+
+    db.access_audit_logs.update_one(
+        {"actor_id": "a", "hash_version": {"$exists": True}},
+        {"$set": {"target_id": "other"}}
+    )
+    assert not audit.verify_chain_integrity()
+
+
+def test_checkpoint_survives_late_segment_flush(db):
+    audit = AuditLogger(db)
+    # Another process buffers an entry (earlier timestamp, shard sorting
+    # before the others) and only flushes it after the checkpoint
+    late_writer = AuditLogger(db, segment_max_entries=10)
+    late_writer.log("read", actor_id="0-late", target_id="doc")
+
+    for actor_id in ["a", "b", "a"]:
+        audit.log("read", actor_id=actor_id, target_id="doc")
+    checkpoint = audit.create_merkle_checkpoint()
+    assert checkpoint["entry_count"] == 3
+
+    late_writer.flush()
+    audit.log("read", actor_id="a", target_id="doc")
+
+    assert audit.verify_checkpoint(checkpoint)
+    covered = db.access_audit_logs.find_one({"actor_id": "b"})
+    proof = audit.get_merkle_proof(covered["_id"], checkpoint)
+    assert proof is not None
+    assert verify_merkle_proof(proof["leaf"], proof["index"], proof["proof"], proof["root"])
+    late = db.access_audit_logs.find_one({"actor_id": "0-late"})
+    assert audit.get_merkle_proof(late["_id"], checkpoint) is None
+
+
+def test_checkpoint_detects_tampering(db):
+    audit = AuditLogger(db)
+    for actor_id in ["a", "b"]:
+        audit.log("read", actor_id=actor_id, target_id="doc")
+    checkpoint = audit.create_merkle_checkpoint()
+
+    db.access_audit_logs.delete_one({"actor_id": "a"})
+    assert not audit.verify_checkpoint(checkpoint)
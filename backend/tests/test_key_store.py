@@ -0,0 +1,165 @@
+"""
+Key store tests (temp key dirs, fake boto3 client for AWS KMS)
+"""
+
+import base64
+import os
+import sys
+import threading
+import time
+import types
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import pytest
+
+from security import key_store
+from security.key_store import AWSKMSKeyStore, LocalKeyStore
+
+
+class FakeKMS:
+    """Wraps keys by reversing them; records every encrypt/decrypt call"""
+
+    def __init__(self):
+        self.encrypt_calls = []
+        self.decrypt_calls = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def generate_data_key(self, KeyId, KeySpec):
+        plaintext = os.urandom(32)
+        return {"Plaintext": plaintext, "CiphertextBlob": plaintext[::-1]}
+
+    def encrypt(self, KeyId, Plaintext):
+        self.encrypt_calls.append(Plaintext)
+        return {"CiphertextBlob": Plaintext[::-1]}
+
+    def decrypt(self, CiphertextBlob):
+        self.decrypt_calls.append(CiphertextBlob)
+        self.release.wait()
+        if CiphertextBlob == b"bad":
+            raise ValueError("InvalidCiphertextException")
+        return {"Plaintext": CiphertextBlob[::-1]}
+
+
+@pytest.fixture
+def kms(monkeypatch):
+    client = FakeKMS()
+    monkeypatch.setitem(sys.modules, "boto3", types.SimpleNamespace(client=lambda *args, **kwargs: client))
+    monkeypatch.setattr(key_store, "KMS_PREFETCH_SIZE", 0)
+    return client
+
+
+def _wrapped(plaintext):
+    return base64.b64encode(plaintext[::-1]).decode("utf-8")
+
+
+def test_unwrap_goes_through_batch_queue(kms):
+    store = AWSKMSKeyStore("alias/test")
+    assert store.unwrap_data_key(_wrapped(b"k" * 31 + b"1"), "v1") == b"k" * 31 + b"1"
+    assert store._decrypt_queue._thread is not None
+    assert len(kms.decrypt_calls) == 1
+
+
+def test_duplicate_wrapped_keys_share_one_decrypt(kms):
+    store = AWSKMSKeyStore("alias/test")
+    kms.release.clear()
+    futures = [store._decrypt_queue.submit(_wrapped(b"same")) for _ in range(5)]
+    futures.append(store._decrypt_queue.submit(_wrapped(b"other")))
+    kms.release.set()
+
+    assert [future.result(timeout=5) for future in futures] == [b"same"] * 5 + [b"other"]
+    assert sorted(kms.decrypt_calls) == [b"emas", b"rehto"]
+
+
+def test_unwrap_error_reaches_caller(kms):
+    store = AWSKMSKeyStore("alias/test")
+    with pytest.raises(ValueError):
+        store.unwrap_data_key(base64.b64encode(b"bad").decode("utf-8"), "v1")
+
+
+def test_unwrap_times_out(kms, monkeypatch):
+    monkeypatch.setattr(key_store, "KMS_DECRYPT_TIMEOUT", 0.05)
+    store = AWSKMSKeyStore("alias/test")
+    kms.release.clear()
+    try:
+        with pytest.raises(FutureTimeoutError):
+            store.unwrap_data_key(_wrapped(b"slow"), "v1")
+    finally:
+        kms.release.set()
+
+
+def test_generated_key_wraps_without_encrypt_call(kms):
+    store = AWSKMSKeyStore("alias/test")
+    data_key = store.get_data_key("v1")
+    wrapped = store.wrap_data_key(data_key, "v1")
+
+    assert kms.encrypt_calls == []
+    assert store.unwrap_data_key(wrapped, "v1") == data_key
+
+    # A key that did not come from generate_data_key is still encrypted
+    other = os.urandom(32)
+    assert store.unwrap_data_key(store.wrap_data_key(other, "v1"), "v1") == other
+    assert kms.encrypt_calls == [other]
+
+
+def test_prefetched_key_keeps_ciphertext_blob(kms, monkeypatch):
+    monkeypatch.setattr(key_store, "KMS_PREFETCH_SIZE", 1)
+    store = AWSKMSKeyStore("alias/test")
+    store._prefetcher.get()  # starts the prefetch thread
+    for _ in range(500):
+        if store._prefetcher._queue.full():
+            break
+        time.sleep(0.01)
+    assert store._prefetcher._queue.full()
+
+    data_key = store.get_data_key("v1")
+    wrapped = store.wrap_data_key(data_key, "v1")
+    assert kms.encrypt_calls == []
+    assert store.unwrap_data_key(wrapped, "v1") == data_key
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_unwrap_works_in_forked_child(kms):
+    store = AWSKMSKeyStore("alias/test")
+    assert store.unwrap_data_key(_wrapped(b"parent"), "v1") == b"parent"
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            ok = store.unwrap_data_key(_wrapped(b"child"), "v1") == b"child"
+        except BaseException:
+            ok = False
+        os._exit(0 if ok else 1)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+
+
+def test_concurrent_local_key_creation_agrees(tmp_path):
+    # Separate instances stand in for separate processes (no shared locks)
+    stores = [LocalKeyStore(str(tmp_path)) for _ in range(8)]
+    barrier = threading.Barrier(len(stores))
+    keys = []
+
+    def create(store):
+        barrier.wait()
+        keys.append(store.get_data_key("v1"))
+
+    threads = [threading.Thread(target=create, args=(store,)) for store in stores]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    key_path = tmp_path / "key_v1.bin"
+    assert len(set(keys)) == 1 and len(keys[0]) == 32
+    assert key_path.read_bytes() == keys[0]
+    assert not list(tmp_path.glob("*.tmp"))
+    if os.name == "posix":
+        assert key_path.stat().st_mode & 0o777 == 0o600
+
+
+def test_truncated_local_key_file_is_rejected(tmp_path):
+    (tmp_path / "key_v1.bin").write_bytes(b"short")
+    with pytest.raises(ValueError):
+        LocalKeyStore(str(tmp_path)).get_data_key("v1")
@@ -0,0 +1,23 @@
+"""
+JWT verification cache tests
+"""
+
+from security.rbac import _verify_jwt_cached, generate_jwt_token, verify_jwt_token
+
+
+def test_invalid_tokens_are_not_cached():
+    _verify_jwt_cached.cache_clear()
+    for index in range(3):
+        assert verify_jwt_token(f"not-a-token-{index}") is None
+    assert _verify_jwt_cached.cache_info().currsize == 0
+
+
+def test_payload_mutation_does_not_leak_into_cache():
+    token = generate_jwt_token("user-1", ["reader"], ["read"])
+    payload = verify_jwt_token(token)
+    payload["roles"].append("admin")
+    payload["scopes"].clear()
+
+    fresh = verify_jwt_token(token)
+    assert fresh["roles"] == ["reader"]
+    assert fresh["scopes"] == ["read"]
@@ -5,16 +5,18 @@ Fine-tune RoBERTa/BERT models for interview answer scoring with calibration.
 
 import torch
 import torch.nn as nn
-from torch.utils.data import Dataset, DataLoader
-from transformers import RobertaTokenizer, RobertaForSequenceClassification, AdamW
+from torch.optim import AdamW
+from torch.utils.data import Dataset, DataLoader, Sampler
+from transformers import RobertaTokenizerFast, RobertaForSequenceClassification, DataCollatorWithPadding
 from sklearn.calibration import CalibratedClassifierCV
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error, mean_absolute_error
-import numpy as np
 import pandas as pd
+import os
 import json
+import math
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import Iterator, List, Dict, Tuple
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -22,36 +24,75 @@ logger = logging.getLogger(__name__)
 
 
 class AnswerDataset(Dataset):
-    """Dataset for interview answer scoring."""
+    """
+    Dataset for interview answer scoring.
+    
+    Texts are tokenized once up front (unpadded); batches are padded to
+    their longest sequence by DataCollatorWithPadding.
+    """
     
     def __init__(self, texts: List[str], scores: List[float], tokenizer, max_length=512):
         self.texts = texts
         self.scores = scores
         self.tokenizer = tokenizer
         self.max_length = max_length
+        
+        encoding = tokenizer(
+            list(texts),
+            truncation=True,
+            padding=False,
+            max_length=max_length
+        )
+        self.input_ids = [torch.tensor(ids, dtype=torch.long) for ids in encoding['input_ids']]
+        self.attention_mask = [torch.tensor(mask, dtype=torch.long) for mask in encoding['attention_mask']]
+        self.score_tensors = torch.tensor(scores, dtype=torch.float)
+        self.lengths = [len(ids) for ids in self.input_ids]
     
     def __len__(self):
         return len(self.texts)
     
     def __getitem__(self, idx):
-        text = self.texts[idx]
-        score = self.scores[idx]
-        
-        encoding = self.tokenizer(
-            text,
-            truncation=True,
-            padding='max_length',
-            max_length=self.max_length,
-            return_tensors='pt'
-        )
-        
         return {
-            'input_ids': encoding['input_ids'].flatten(),
-            'attention_mask': encoding['attention_mask'].flatten(),
-            'score': torch.tensor(score, dtype=torch.float)
+            'input_ids': self.input_ids[idx],
+            'attention_mask': self.attention_mask[idx],
+            'score': self.score_tensors[idx]
         }
 
 
+class LengthGroupedBatchSampler(Sampler):
+    """
+    Batch sampler that groups answers of similar token length.
+    
+    Indices are shuffled, split into mega-buckets of batch_size * bucket_factor,
+    sorted by length within each bucket, and cut into batches; batch order is
+    then shuffled. Batches stay random across epochs but need little padding.
+    """
+    
+    def __init__(self, lengths: List[int], batch_size: int, bucket_factor: int = 50, shuffle: bool = True):
+        self.lengths = lengths
+        self.batch_size = batch_size
+        self.bucket_size = batch_size * bucket_factor
+        self.shuffle = shuffle
+    
+    def __len__(self):
+        return math.ceil(len(self.lengths) / self.batch_size)
+    
+    def __iter__(self) -> Iterator[List[int]]:
+        if self.shuffle:
+            indices = torch.randperm(len(self.lengths)).tolist()
+        else:
+            indices = list(range(len(self.lengths)))
+        
+        batches = []
+        for start in range(0, len(indices), self.bucket_size):
+            bucket = sorted(indices[start:start + self.bucket_size], key=self.lengths.__getitem__, reverse=True)
+            batches.extend(bucket[i:i + self.batch_size] for i in range(0, len(bucket), self.batch_size))
+        
+        if self.shuffle:
+            batches = [batches[i] for i in torch.randperm(len(batches)).tolist()]
+        return iter(batches)
+
+
 class RegressionHead(nn.Module):
     """Regression head for scoring (0-100)."""
     
@@ -72,12 +113,16 @@ class RegressionHead(nn.Module):
 class ScoringModel(nn.Module):
     """RoBERTa-based scoring model."""
     
-    def __init__(self, model_name='roberta-base'):
+    def __init__(self, model_name='roberta-base', use_checkpointing=True):
         super().__init__()
         self.roberta = RobertaForSequenceClassification.from_pretrained(
             model_name,
             num_labels=1
         )
+        if use_checkpointing:
+            # Recompute layer activations during backward instead of storing them
+            self.roberta.gradient_checkpointing_enable()
+            self.roberta.config.use_cache = False
         # Replace classification head with regression head
         self.roberta.classifier = RegressionHead()
     
@@ -137,6 +182,13 @@ def load_training_data(data_path: str) -> Tuple[List[str], Dict[str, List[float]
     return texts, scores
 
 
+def _autocast_dtype() -> torch.dtype:
+    """BF16 where the GPU supports it (no loss scaling needed), FP16 otherwise"""
+    if torch.cuda.is_available() and torch.cuda.is_bf16_supported():
+        return torch.bfloat16
+    return torch.float16
+
+
 def train_model(
     model: nn.Module,
     train_loader: DataLoader,
@@ -149,47 +201,65 @@ def train_model(
     Train the scoring model.
     """
     model = model.to(device)
-    optimizer = AdamW(model.parameters(), lr=lr)
+    compiled_model = model
+    if device == 'cuda':
+        # TF32 matmuls on Ampere+, and TorchInductor kernel fusion. Batches are
+        # dynamically padded, so compile for dynamic shapes (CUDA-graph
+        # "reduce-overhead" mode would re-record for every sequence length).
+        torch.set_float32_matmul_precision('high')
+        compiled_model = torch.compile(model, dynamic=True)
+    
+    # Fused CUDA kernel for the parameter updates (not supported on CPU)
+    optimizer = AdamW(model.parameters(), lr=lr, fused=(device == 'cuda' and torch.cuda.is_available()))
     criterion = nn.MSELoss()
     
+    # Mixed precision on CUDA: bf16/fp16 matmuls on Tensor Cores, fp32 master
+    # weights. Only fp16 needs loss scaling; a disabled scaler is a pass-through.
+    use_amp = device == 'cuda'
+    amp_dtype = _autocast_dtype()
+    scaler = torch.amp.GradScaler("cuda", enabled=use_amp and amp_dtype == torch.float16)
+    
     best_val_loss = float('inf')
     
     for epoch in range(epochs):
         # Training
-        model.train()
+        compiled_model.train()
         train_loss = 0
         for batch in train_loader:
-            input_ids = batch['input_ids'].to(device)
-            attention_mask = batch['attention_mask'].to(device)
-            scores = batch['score'].to(device)
+            input_ids = batch['input_ids'].to(device, non_blocking=True)
+            attention_mask = batch['attention_mask'].to(device, non_blocking=True)
+            scores = batch['score'].to(device, non_blocking=True)
             
-            optimizer.zero_grad()
-            predictions = model(input_ids, attention_mask).squeeze()
-            loss = criterion(predictions, scores)
-            loss.backward()
-            optimizer.step()
+            optimizer.zero_grad(set_to_none=True)
+            with torch.autocast(device_type='cuda', dtype=amp_dtype, enabled=use_amp):
+                predictions = compiled_model(input_ids, attention_mask).squeeze()
+                loss = criterion(predictions, scores)
+            scaler.scale(loss).backward()
+            scaler.step(optimizer)
+            scaler.update()
             
             train_loss += loss.item()
         
         avg_train_loss = train_loss / len(train_loader)
         
         # Validation
-        model.eval()
+        compiled_model.eval()
         val_loss = 0
         predictions_list = []
         targets_list = []
         
-        with torch.no_grad():
+        with torch.inference_mode():
             for batch in val_loader:
-                input_ids = batch['input_ids'].to(device)
-                attention_mask = batch['attention_mask'].to(device)
-                scores = batch['score'].to(device)
+                input_ids = batch['input_ids'].to(device, non_blocking=True)
+                attention_mask = batch['attention_mask'].to(device, non_blocking=True)
+                scores = batch['score'].to(device, non_blocking=True)
                 
-                predictions = model(input_ids, attention_mask).squeeze()
-                loss = criterion(predictions, scores)
+                with torch.autocast(device_type='cuda', dtype=amp_dtype, enabled=use_amp):
+                    predictions = compiled_model(input_ids, attention_mask).squeeze()
+                    loss = criterion(predictions, scores)
                 
                 val_loss += loss.item()
-                predictions_list.extend(predictions.cpu().numpy())
+                predictions_list.extend(predictions.float().cpu().numpy())
                 targets_list.extend(scores.cpu().numpy())
         
         avg_val_loss = val_loss / len(val_loader)
@@ -216,21 +286,32 @@ def calibrate_scores(model: nn.Module, data_loader: DataLoader, device: str = 'c
     Apply isotonic calibration to map model outputs to human-meaningful 0-100 range.
     """
     model.eval()
-    predictions = []
-    targets = []
     
-    with torch.no_grad():
+    # Preallocated host buffers; GPU->host copies are async until the final sync
+    num_examples = len(data_loader.dataset)
+    use_cuda = device == 'cuda'
+    predictions_buf = torch.empty(num_examples, pin_memory=use_cuda)
+    targets_buf = torch.empty(num_examples)
+    offset = 0
+    
+    with torch.inference_mode():
         for batch in data_loader:
-            input_ids = batch['input_ids'].to(device)
-            attention_mask = batch['attention_mask'].to(device)
+            input_ids = batch['input_ids'].to(device, non_blocking=True)
+            attention_mask = batch['attention_mask'].to(device, non_blocking=True)
             scores = batch['score']
             
-            preds = model(input_ids, attention_mask).squeeze()
-            predictions.extend(preds.cpu().numpy())
-            targets.extend(scores.numpy())
+            with torch.autocast(device_type='cuda', dtype=_autocast_dtype(), enabled=use_cuda):
+                preds = model(input_ids, attention_mask).reshape(-1)
+            size = preds.shape[0]
+            predictions_buf[offset:offset + size].copy_(preds, non_blocking=True)
+            targets_buf[offset:offset + size].copy_(scores)
+            offset += size
     
-    predictions = np.array(predictions).reshape(-1, 1)
-    targets = np.array(targets)
+    if use_cuda:
+        torch.cuda.synchronize()
+    
+    predictions = predictions_buf[:offset].numpy().reshape(-1, 1)
+    targets = targets_buf[:offset].numpy()
     
     # Fit isotonic regression
     from sklearn.isotonic import IsotonicRegression
@@ -251,10 +332,11 @@ def main():
     # Configuration
     DATA_PATH = "training_data.json"  # Replace with your data path
     MODEL_NAME = "roberta-base"
-    BATCH_SIZE = 16
+    BATCH_SIZE = 32  # fits with gradient checkpointing + mixed precision
     EPOCHS = 3
     LR = 2e-5
     DEVICE = 'cuda' if torch.cuda.is_available() else 'cpu'
+    NUM_WORKERS = (os.cpu_count() or 2) // 2
     
     logger.info(f"Using device: {DEVICE}")
     
@@ -302,12 +384,24 @@ def main():
         )
         
         # Create datasets
-        tokenizer = RobertaTokenizer.from_pretrained(MODEL_NAME)
+        tokenizer = RobertaTokenizerFast.from_pretrained(MODEL_NAME)
         train_dataset = AnswerDataset(X_train, y_train, tokenizer)
         val_dataset = AnswerDataset(X_val, y_val, tokenizer)
         
-        train_loader = DataLoader(train_dataset, batch_size=BATCH_SIZE, shuffle=True)
-        val_loader = DataLoader(val_dataset, batch_size=BATCH_SIZE)
+        # Pad each batch to its own longest answer rather than max_length
+        collator = DataCollatorWithPadding(tokenizer)
+        # Collate in worker processes and pin batches for async host-to-GPU copies
+        loader_kwargs = {
+            'collate_fn': collator,
+            'num_workers': NUM_WORKERS,
+            'pin_memory': DEVICE == 'cuda'
+        }
+        if NUM_WORKERS > 0:
+            loader_kwargs.update(persistent_workers=True, prefetch_factor=4)
+        # Length-grouped batches so dynamic padding adds few pad tokens
+        train_sampler = LengthGroupedBatchSampler(train_dataset.lengths, BATCH_SIZE)
+        train_loader = DataLoader(train_dataset, batch_sampler=train_sampler, **loader_kwargs)
+        val_loader = DataLoader(val_dataset, batch_size=BATCH_SIZE, **loader_kwargs)
         
         # Initialize model
         model = ScoringModel(MODEL_NAME)
@@ -322,11 +416,21 @@ def main():
         
         # Calibrate
         calibrator = calibrate_scores(trained_model, val_loader, DEVICE)
+        
+        # INT8 dynamic quantization of the Linear layers for CPU inference
+        # (Sigmoid and the 0-100 rescale stay in FP32)
+        quantized_model = torch.quantization.quantize_dynamic(
+            trained_model.cpu(), {nn.Linear}, dtype=torch.qint8
+        )
+        quantized_path = f"{component}_model_int8.pt"
+        torch.save(quantized_model.state_dict(), quantized_path)
+        logger.info(f"Saved INT8 {component} model to {quantized_path}")
         logger.info(f"Completed training for {component}\n")
     
     logger.info("Training complete!")
     logger.info("\nTo use the trained models:")
     logger.info("1. Update scoring_config.json with model paths")
+    logger.info("   (<component>_model.pt for GPU, <component>_model_int8.pt for CPU inference)")
     logger.info("2. Load models in models/answer_scorer.py")
     logger.info("3. Apply calibration when making predictions")
 
@@ -11,14 +11,22 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent / "backend"))
 
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 from processors.text_processor import get_text_processor
 
-async def fix_missing_tokens(dry_run=True):
+BATCH_SIZE = 500
+
+async def fix_missing_tokens(dry_run=True, limit=100):
     """
     Find and fix answers that have text but no tokens.
     
+    Documents are processed in batches: texts in a batch are tokenized
+    concurrently and their updates are sent in one bulk_write.
+    
     Args:
         dry_run: If True, only report what would be fixed without making changes
+        limit: Maximum number of documents to process (0 for no limit)
     """
     client = AsyncIOMotorClient("mongodb://localhost:27017")
     db = client["interview_db"]
@@ -42,12 +50,19 @@ async def fix_missing_tokens(dry_run=True):
         ]
     }
     
-    # Simplified query for better MongoDB compatibility
+    # Simplified query for better MongoDB compatibility.
+    # tokens and token_count are always written together; the token_count
+    # predicate lets the query use the (scalar) token_count index instead of
+    # a collection scan. Partial indexes can't express {$exists: False}.
     query = {
+        "token_count": {"$exists": False},
         "tokens": {"$exists": False},
         "original_text": {"$exists": True}
     }
     
+    # Same index the processing service creates at startup
+    await db.answers.create_index([("token_count", 1)])
+    
     total_count = await db.answers.count_documents(query)
     print(f"📊 Found {total_count} documents missing tokens")
     
@@ -68,23 +83,40 @@ async def fix_missing_tokens(dry_run=True):
     fixed_count = 0
     error_count = 0
     
-    cursor = db.answers.find(query).limit(100)  # Limit for safety
+    cursor = db.answers.find(query)
+    if limit:
+        cursor = cursor.limit(limit)  # Limit for safety
     
-    async for doc in cursor:
-        try:
-            # Get text (prefer original_text, fallback to cleaned_text)
+    while True:
+        batch = await cursor.to_list(length=BATCH_SIZE)
+        if not batch:
+            break
+        
+        # Get text (prefer original_text, fallback to cleaned_text)
+        docs = []
+        for doc in batch:
             text = doc.get("original_text") or doc.get("cleaned_text")
-            
             if not text:
                 print(f"⚠️  {doc['_id']}: No text found, skipping")
                 continue
-            
-            # Process text to get tokens
-            text_result = await text_processor.process_text(
+            docs.append((doc, text))
+        
+        # Process texts to get tokens
+        text_results = await asyncio.gather(*[
+            text_processor.process_text(
                 text,
                 compute_embedding=False,
                 lowercase_tokens=False
             )
+            for _, text in docs
+        ], return_exceptions=True)
+        
+        operations = []
+        for (doc, text), text_result in zip(docs, text_results):
+            if isinstance(text_result, Exception):
+                error_count += 1
+                print(f"✗ Failed to fix {doc.get('_id', 'unknown')}: {text_result}")
+                continue
             
             tokens = text_result["tokens"]
             token_count = text_result["token_count"]
@@ -95,6 +127,7 @@ async def fix_missing_tokens(dry_run=True):
                 print(f"  Would add {token_count} tokens")
                 print(f"  Sample: {tokens[:5]}")
                 print()
+                fixed_count += 1
             else:
                 # Update document
                 update_data = {
@@ -106,18 +139,32 @@ async def fix_missing_tokens(dry_run=True):
                 if "cleaned_text" not in doc:
                     update_data["cleaned_text"] = text_result["cleaned_text"]
                 
-                await db.answers.update_one(
+                operations.append((doc["_id"], token_count, UpdateOne(
                     {"_id": doc["_id"]},
                     {"$set": update_data}
-                )
-                
-                print(f"✓ Fixed {doc['_id']}: added {token_count} tokens")
-            
-            fixed_count += 1
-            
+                )))
+        
+        if not operations:
+            continue
+        
+        failed_indexes = set()
+        try:
+            await db.answers.bulk_write([op for _, _, op in operations], ordered=False)
+        except BulkWriteError as e:
+            for write_error in e.details.get("writeErrors", []):
+                failed_indexes.add(write_error["index"])
+                doc_id = operations[write_error["index"]][0]
+                print(f"✗ Failed to fix {doc_id}: {write_error.get('errmsg')}")
         except Exception as e:
-            error_count += 1
-            print(f"✗ Failed to fix {doc.get('_id', 'unknown')}: {e}")
+            failed_indexes = set(range(len(operations)))
+            print(f"✗ Failed to write batch of {len(operations)} documents: {e}")
+        
+        for index, (doc_id, token_count, _) in enumerate(operations):
+            if index in failed_indexes:
+                error_count += 1
+            else:
+                fixed_count += 1
+                print(f"✓ Fixed {doc_id}: added {token_count} tokens")
     
     print()
     print("=" * 70)
@@ -150,6 +197,13 @@ if __name__ == "__main__":
         help="Actually apply fixes (default is dry-run)"
     )
     
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=100,
+        help="Maximum number of documents to process (0 for no limit, default 100)"
+    )
+    
     args = parser.parse_args()
     
-    asyncio.run(fix_missing_tokens(dry_run=not args.apply))
+    asyncio.run(fix_missing_tokens(dry_run=not args.apply, limit=args.limit))
@@ -1,13 +1,39 @@
 import os
 import re
 import json
+from collections import Counter
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple
 
-from presidio_analyzer import AnalyzerEngine, RecognizerResult, EntityRecognizer
+from presidio_analyzer import AnalyzerEngine, BatchAnalyzerEngine, RecognizerResult, EntityRecognizer
 from presidio_analyzer.nlp_engine import NlpEngineProvider
 from presidio_anonymizer import AnonymizerEngine, AnonymizerConfig
 
+try:
+    import ahocorasick  # pyahocorasick: C multi-pattern matcher for large name lists
+except ImportError:
+    ahocorasick = None
+
+
+# Spoken separators/symbols -> characters, matched in a single pass
+_STT_SYMBOLS = {
+    "at": "@",
+    "dot": ".",
+    "underscore": "_",
+    "dash": "-",
+    "hyphen": "-",
+    "plus": "+",
+    "minus": "-",
+}
+_STT_SYMBOL_RE = re.compile(r"\s+(at|dot|underscore|dash|hyphen|plus|minus)\s+", re.IGNORECASE)
+_STT_FILLERS = re.compile(r"\s*\b(?:uh|um|erm)\b\s*", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+# Word-ish tokens considered by the first-name gazetteer
+_NAME_TOKEN_RE = re.compile(r"[A-Za-z][A-Za-z\-']+")
+_NAME_TOKEN_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz-'")
+
 
 def normalize_stt_text(text: str) -> str:
     """
@@ -24,25 +50,13 @@ def normalize_stt_text(text: str) -> str:
     # Pad with spaces to make replacements reliably on word boundaries
     t = f" {t} "
 
-    replacements = [
-        (r"\s+at\s+", "@"),
-        (r"\s+dot\s+", "."),
-        (r"\s+underscore\s+", "_"),
-        (r"\s+dash\s+", "-"),
-        (r"\s+hyphen\s+", "-"),
-        (r"\s+plus\s+", "+"),
-        (r"\s+minus\s+", "-"),
-    ]
-    for pat, repl in replacements:
-        t = re.sub(pat, repl, t, flags=re.IGNORECASE)
+    t = _STT_SYMBOL_RE.sub(lambda m: _STT_SYMBOLS[m.group(1).lower()], t)
 
     # Remove filler words that often break NER context (optional, conservative)
-    fillers = [r"\buh\b", r"\bum\b", r"\berm\b"]
-    for f in fillers:
-        t = re.sub(fr"\s*{f}\s*", " ", t, flags=re.IGNORECASE)
+    t = _STT_FILLERS.sub(" ", t)
 
     # Collapse spaces and trim
-    t = re.sub(r"\s+", " ", t).strip()
+    t = _WHITESPACE.sub(" ", t).strip()
     return t
 
 
@@ -69,6 +83,7 @@ class FirstNameGazetteerRecognizer(EntityRecognizer):
         ]
         names = first_names or fallback
         self.first_names = {n.lower(): True for n in names}
+        self._automaton = None  # built lazily from first_names
 
         # context patterns to capture names following intros
         self._ctx_patterns = [
@@ -83,6 +98,7 @@ class FirstNameGazetteerRecognizer(EntityRecognizer):
                 name = line.strip()
                 if name:
                     self.first_names[name.lower()] = True
+        self._automaton = None
 
     def analyze(  # type: ignore[override]
         self, text: str, entities: List[str], nlp_artifacts=None
@@ -102,22 +118,82 @@ class FirstNameGazetteerRecognizer(EntityRecognizer):
                     results.append(RecognizerResult(entity_type="PERSON", start=start2, end=end2, score=0.85))
 
         # 2) Gazetteer single-token names + simple bigrams
+        lowered = text.lower()
+        if ahocorasick is not None and len(lowered) == len(text):
+            spans = self._gazetteer_spans_automaton(text, lowered)
+        else:
+            spans = self._gazetteer_spans_tokens(text)
+        for s, e, bigram_end in spans:
+            # modest score to let spaCy override if confident
+            results.append(RecognizerResult(entity_type="PERSON", start=s, end=e, score=0.60))
+            if bigram_end is not None:
+                # cover common lower/upper cases in ASR
+                results.append(RecognizerResult(entity_type="PERSON", start=s, end=bigram_end, score=0.70))
+
+        return results
+
+    @staticmethod
+    def _bigram_end(next_token: Optional[str], next_end: int) -> Optional[int]:
+        # basic heuristic to avoid joining with short/stop tokens
+        if next_token is not None and len(next_token) >= 2 and next_token.isalpha():
+            return next_end
+        return None
+
+    def _gazetteer_spans_tokens(self, text: str) -> List[Tuple[int, int, Optional[int]]]:
+        """Gazetteer names by tokenizing and looking up each token"""
         tokens: List[Tuple[str, int, int]] = [
-            (m.group(0), m.start(), m.end()) for m in re.finditer(r"[A-Za-z][A-Za-z\-']+", text)
+            (m.group(0), m.start(), m.end()) for m in _NAME_TOKEN_RE.finditer(text)
         ]
+        spans = []
         for i, (tok, s, e) in enumerate(tokens):
             if tok.lower() in self.first_names:
-                # modest score to let spaCy override if confident
-                results.append(RecognizerResult(entity_type="PERSON", start=s, end=e, score=0.60))
                 # try bigram with next token if it looks like a surname-ish token
-                if i + 1 < len(tokens):
-                    ntok, ns, ne = tokens[i + 1]
-                    # basic heuristic to avoid joining with short/stop tokens
-                    if len(ntok) >= 2 and ntok.isalpha():
-                        # cover common lower/upper cases in ASR
-                        results.append(RecognizerResult(entity_type="PERSON", start=s, end=ne, score=0.70))
+                ntok, _, ne = tokens[i + 1] if i + 1 < len(tokens) else (None, 0, 0)
+                spans.append((s, e, self._bigram_end(ntok, ne)))
+        return spans
+
+    def _build_automaton(self):
+        automaton = ahocorasick.Automaton()
+        for name in self.first_names:
+            # Only whole tokens can match, as in the token lookup
+            if _NAME_TOKEN_RE.fullmatch(name):
+                automaton.add_word(name, len(name))
+        if len(automaton):
+            automaton.make_automaton()
+        self._automaton = automaton
+
+    def _gazetteer_spans_automaton(self, text: str, lowered: str) -> List[Tuple[int, int, Optional[int]]]:
+        """Gazetteer names in one Aho-Corasick pass, kept only where they are whole tokens"""
+        if self._automaton is None:
+            self._build_automaton()
+        if not len(self._automaton):
+            return []
 
-        return results
+        spans = []
+        for last, length in self._automaton.iter(lowered):
+            s, e = last - length + 1, last + 1
+            if e < len(text) and text[e] in _NAME_TOKEN_CHARS:
+                continue
+            # A token covers s - 1 if the run of token chars before s has a letter
+            i = s - 1
+            while i >= 0 and text[i] in _NAME_TOKEN_CHARS and not text[i].isalpha():
+                i -= 1
+            if i >= 0 and text[i] in _NAME_TOKEN_CHARS:
+                continue
+            nxt = _NAME_TOKEN_RE.search(text, e)
+            spans.append((s, e, self._bigram_end(nxt and nxt.group(0), nxt.end() if nxt else 0)))
+        spans.sort()
+        return spans
+
+
+@lru_cache(maxsize=4)
+def _get_nlp_engine(language: str, model_name: str):
+    """Load a spaCy NLP engine once per (language, model) and share it across sanitizers"""
+    provider = NlpEngineProvider(nlp_configuration={
+        "nlp_engine_name": "spacy",
+        "models": [{"lang_code": language, "model_name": model_name}],
+    })
+    return provider.create_engine()
 
 
 @dataclass
@@ -176,12 +252,8 @@ class EnhancedPIISanitizer:
         self.mode = mode
         self.hipaa_mode = hipaa_mode
 
-        # Build NLP engine (spaCy) and analyzer
-        provider = NlpEngineProvider(nlp_configuration={
-            "nlp_engine_name": "spacy",
-            "models": [{"lang_code": language, "model_name": "en_core_web_lg"}],
-        })
-        nlp_engine = provider.create_engine()
+        # Build NLP engine (spaCy, cached across instances) and analyzer
+        nlp_engine = _get_nlp_engine(language, "en_core_web_lg")
         self.analyzer = AnalyzerEngine(nlp_engine=nlp_engine)
 
         # Add custom name recognizer to improve PERSON recall
@@ -190,6 +262,8 @@ class EnhancedPIISanitizer:
         if first_names_file:
             gaz.load_external_names(first_names_file)
         self.analyzer.registry.add_recognizer(gaz)
+        # Runs many texts through spaCy's nlp.pipe instead of one call per text
+        self.batch_analyzer = BatchAnalyzerEngine(analyzer_engine=self.analyzer)
 
         # Anonymizer
         self.anonymizer = AnonymizerEngine()
@@ -217,7 +291,9 @@ class EnhancedPIISanitizer:
     def analyze(self, text: str) -> List[RecognizerResult]:
         if not text:
             return []
-        normalized = normalize_stt_text(text)
+        return self._analyze_normalized(normalize_stt_text(text))
+
+    def _analyze_normalized(self, normalized: str) -> List[RecognizerResult]:
         return self.analyzer.analyze(text=normalized, entities=self.entities, language=self.language)
 
     def anonymize(self, text: str, results: Optional[List[RecognizerResult]] = None) -> Tuple[str, str]:
@@ -225,26 +301,22 @@ class EnhancedPIISanitizer:
         Returns (anonymized_text, normalized_text_used)
         """
         normalized = normalize_stt_text(text)
-        results = results if results is not None else self.analyzer.analyze(
-            text=normalized, entities=self.entities, language=self.language
-        )
-        out = self.anonymizer.anonymize(
+        results = results if results is not None else self._analyze_normalized(normalized)
+        return self._anonymize_normalized(normalized, results), normalized
+
+    def _anonymize_normalized(self, normalized: str, results: List[RecognizerResult]) -> str:
+        return self.anonymizer.anonymize(
             text=normalized,
             analyzer_results=results,
             anonymizers_config=self.anonymizers_config,
         ).text
-        return out, normalized
 
-    def sanitize_text(self, text: str) -> SanitizationResult:
-        results = self.analyze(text)
-        anonymized, normalized = self.anonymize(text, results)
+    def _build_result(self, results: List[RecognizerResult], anonymized: str, normalized: str) -> SanitizationResult:
         entities_found = [
             {"entity_type": r.entity_type, "start": r.start, "end": r.end, "score": r.score}
             for r in results
         ]
-        counts: Dict[str, int] = {}
-        for r in results:
-            counts[r.entity_type] = counts.get(r.entity_type, 0) + 1
+        counts: Dict[str, int] = dict(Counter(r.entity_type for r in results))
 
         return SanitizationResult(
             anonymized_text=anonymized,
@@ -255,6 +327,35 @@ class EnhancedPIISanitizer:
             normalized_text=normalized,
         )
 
+    def sanitize_text(self, text: str) -> SanitizationResult:
+        # Normalize once and reuse it for both analysis and anonymization
+        normalized = normalize_stt_text(text)
+        results = self._analyze_normalized(normalized) if text else []
+        anonymized = self._anonymize_normalized(normalized, results)
+        return self._build_result(results, anonymized, normalized)
+
+    def sanitize_texts(self, texts: List[str], batch_size: int = 32) -> List[SanitizationResult]:
+        """
+        Sanitize many texts, analyzing them as one batched spaCy pipeline run
+        """
+        normalized_texts = [normalize_stt_text(t) if t else t for t in texts]
+        to_analyze = [i for i, t in enumerate(normalized_texts) if t]
+        analyzed = self.batch_analyzer.analyze_iterator(
+            [normalized_texts[i] for i in to_analyze],
+            language=self.language,
+            entities=self.entities,
+            batch_size=batch_size,
+        )
+        all_results: List[List[RecognizerResult]] = [[] for _ in texts]
+        for i, results in zip(to_analyze, analyzed):
+            all_results[i] = results
+
+        out: List[SanitizationResult] = []
+        for normalized, results in zip(normalized_texts, all_results):
+            anonymized = self._anonymize_normalized(normalized, results) if normalized else normalized
+            out.append(self._build_result(results, anonymized, normalized))
+        return out
+
 
 if __name__ == "__main__":
     import argparse
@@ -263,27 +364,36 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Enhanced NER-based PII sanitization for ASR transcripts")
     parser.add_argument("--mode", choices=["mask", "redact", "hash", "encrypt"], default="mask")
     parser.add_argument("--hipaa", action="store_true")
-    parser.add_argument("--json", action="store_true", help="treat stdin as JSON string value under key 'text'")
+    parser.add_argument("--json", action="store_true", help="treat stdin as JSON with a string under 'text' or a list under 'texts'")
     args = parser.parse_args()
 
     sanitizer = EnhancedPIISanitizer(mode=args.mode, hipaa_mode=args.hipaa)
 
+    def to_json(res: SanitizationResult) -> Dict[str, Any]:
+        return {
+            "anonymized_text": res.anonymized_text,
+            "entity_counts": res.entity_counts,
+            "mode": res.mode,
+            "hipaa_mode": res.hipaa_mode,
+            "normalized_text": res.normalized_text,
+        }
+
     data = sys.stdin.read()
+    texts = None
     if args.json:
         try:
             payload = json.loads(data)
-            text = payload.get("text", "")
+            if isinstance(payload.get("texts"), list):
+                texts = payload["texts"]
+            else:
+                text = payload.get("text", "")
         except Exception:
             print("{}", end="")
             sys.exit(0)
     else:
         text = data
 
-    res = sanitizer.sanitize_text(text)
-    print(json.dumps({
-        "anonymized_text": res.anonymized_text,
-        "entity_counts": res.entity_counts,
-        "mode": res.mode,
-        "hipaa_mode": res.hipaa_mode,
-        "normalized_text": res.normalized_text,
-    }, ensure_ascii=False))
+    if texts is not None:
+        print(json.dumps([to_json(res) for res in sanitizer.sanitize_texts(texts)], ensure_ascii=False))
+    else:
+        print(json.dumps(to_json(sanitizer.sanitize_text(text)), ensure_ascii=False))
@@ -9,9 +9,48 @@ import os
 import time
 import threading
 import signal
+import select
+import socket
 import webbrowser
+from concurrent.futures import ThreadPoolExecutor
+from importlib.util import find_spec
 from pathlib import Path
 
+# Forward log lines as they arrive, even when this script's stdout is piped
+if hasattr(sys.stdout, "reconfigure"):
+    sys.stdout.reconfigure(line_buffering=True, write_through=True)
+
+BACKEND_PREFIX = b"[BACKEND] "
+FRONTEND_PREFIX = b"[FRONTEND] "
+
+# Python dependencies: import name -> pip package name
+PYTHON_DEPENDENCIES = {
+    "flask": "flask",
+    "flask_cors": "flask-cors",
+    "pymongo": "pymongo",
+    "werkzeug": "werkzeug",
+    "requests": "requests",
+}
+
+def wait_port(port, timeout=30, process=None, stop_event=None):
+    """
+    Poll until something accepts connections on localhost:port
+    
+    Returns False on timeout, as soon as the given process exits,
+    or once stop_event is set.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if stop_event is not None and stop_event.is_set():
+            return False
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            if sock.connect_ex(("127.0.0.1", port)) == 0:
+                return True
+        if process is not None and process.poll() is not None:
+            return False
+        time.sleep(0.05)
+    return False
+
 class ServerRunner:
     def __init__(self):
         self.backend_process = None
@@ -19,19 +58,19 @@ class ServerRunner:
         self.base_dir = Path(__file__).parent
         self.backend_dir = self.base_dir / "backend"
         self.frontend_dir = self.base_dir / "frontend"
+        self.shutdown_event = threading.Event()
         
     def check_dependencies(self):
         """Check if required dependencies are installed"""
         print("🔍 Checking dependencies...")
         
-        # Check Python dependencies
-        try:
-            import flask
-            import flask_cors
+        # Check Python dependencies (locate them without importing them)
+        missing = [package for module, package in PYTHON_DEPENDENCIES.items() if find_spec(module) is None]
+        if not missing:
             print("✅ Python Flask dependencies found")
-        except ImportError:
-            print("❌ Missing Python dependencies. Installing...")
-            subprocess.check_call([sys.executable, "-m", "pip", "install", "flask", "flask-cors", "pymongo", "werkzeug"])
+        else:
+            print(f"❌ Missing Python dependencies: {', '.join(missing)}. Installing...")
+            subprocess.check_call([sys.executable, "-m", "pip", "install", *missing])
             print("✅ Python dependencies installed")
         
         # Check if Node.js is installed
@@ -49,9 +88,9 @@ class ServerRunner:
         # Check if npm dependencies are installed
         if not (self.frontend_dir / "node_modules").exists():
             print("📦 Installing frontend dependencies...")
-            result = subprocess.run(["npm", "install"], cwd=self.frontend_dir, capture_output=True, text=True)
+            result = subprocess.run(["npm", "install"], cwd=self.frontend_dir, capture_output=True)
             if result.returncode != 0:
-                print(f"❌ Failed to install frontend dependencies: {result.stderr}")
+                print(f"❌ Failed to install frontend dependencies: {result.stderr.decode('utf-8', 'replace')}")
                 return False
             print("✅ Frontend dependencies installed")
         else:
@@ -59,6 +98,25 @@ class ServerRunner:
             
         return True
     
+    def _pump_output(self, process, prefix):
+        """Forward a child's stdout in large chunks, prefixing each line"""
+        out = sys.stdout.buffer
+        pending = b""
+        while True:
+            chunk = process.stdout.read1(65536)
+            if not chunk:
+                break
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            if lines:
+                sys.stdout.flush()  # keep ordering with text-mode prints
+                out.write(b"".join(prefix + line.rstrip() + b"\n" for line in lines))
+                out.flush()
+        if pending.strip():
+            sys.stdout.flush()
+            out.write(prefix + pending.rstrip() + b"\n")
+            out.flush()
+    
     def start_backend(self):
         """Start the backend server"""
         print("🚀 Starting backend server...")
@@ -67,30 +125,24 @@ class ServerRunner:
                 [sys.executable, "start_server.py"],
                 cwd=self.backend_dir,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
-                universal_newlines=True
+                stderr=subprocess.STDOUT
             )
             
             # Monitor backend output
-            def monitor_backend():
-                for line in iter(self.backend_process.stdout.readline, ''):
-                    if line:
-                        print(f"[BACKEND] {line.strip()}")
-                        
-            backend_thread = threading.Thread(target=monitor_backend, daemon=True)
+            backend_thread = threading.Thread(
+                target=self._pump_output, args=(self.backend_process, BACKEND_PREFIX), daemon=True
+            )
             backend_thread.start()
             
-            # Wait a moment for backend to start
-            time.sleep(3)
-            
-            if self.backend_process.poll() is None:
+            # Wait until the backend accepts connections
+            if wait_port(5001, timeout=30, process=self.backend_process, stop_event=self.shutdown_event):
                 print("✅ Backend server started successfully on http://localhost:5001")
                 return True
-            else:
+            elif self.backend_process.poll() is not None:
                 print("❌ Backend server failed to start")
-                return False
+            elif not self.shutdown_event.is_set():
+                print("❌ Backend server did not open port 5001 within 30s")
+            return False
                 
         except Exception as e:
             print(f"❌ Error starting backend: {e}")
@@ -109,30 +161,24 @@ class ServerRunner:
                 cwd=self.frontend_dir,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
-                universal_newlines=True,
                 env=env
             )
             
             # Monitor frontend output
-            def monitor_frontend():
-                for line in iter(self.frontend_process.stdout.readline, ''):
-                    if line:
-                        print(f"[FRONTEND] {line.strip()}")
-                        
-            frontend_thread = threading.Thread(target=monitor_frontend, daemon=True)
+            frontend_thread = threading.Thread(
+                target=self._pump_output, args=(self.frontend_process, FRONTEND_PREFIX), daemon=True
+            )
             frontend_thread.start()
             
-            # Wait for frontend to start
-            time.sleep(10)
-            
-            if self.frontend_process.poll() is None:
+            # Wait until the frontend dev server accepts connections
+            if wait_port(3000, timeout=60, process=self.frontend_process, stop_event=self.shutdown_event):
                 print("✅ Frontend server started successfully on http://localhost:3000")
                 return True
-            else:
+            elif self.frontend_process.poll() is not None:
                 print("❌ Frontend server failed to start")
-                return False
+            elif not self.shutdown_event.is_set():
+                print("❌ Frontend server did not open port 3000 within 60s")
+            return False
                 
         except Exception as e:
             print(f"❌ Error starting frontend: {e}")
@@ -142,15 +188,17 @@ class ServerRunner:
         """Test if both servers are responding"""
         print("🧪 Testing server connectivity...")
         
-        try:
-            import requests
-        except ImportError:
-            subprocess.check_call([sys.executable, "-m", "pip", "install", "requests"])
-            import requests
+        # requests is installed by check_dependencies
+        import requests
+        from requests.adapters import HTTPAdapter
+        
+        # One pooled session for both probes
+        session = requests.Session()
+        session.mount("http://", HTTPAdapter(pool_connections=2, pool_maxsize=2))
         
         # Test backend
         try:
-            response = requests.get("http://localhost:5001/api/status", timeout=5)
+            response = session.get("http://localhost:5001/api/status", timeout=5)
             if response.status_code == 200:
                 print("✅ Backend server is responding")
             else:
@@ -160,17 +208,20 @@ class ServerRunner:
         
         # Test frontend (just check if port is open)
         try:
-            response = requests.get("http://localhost:3000", timeout=5)
+            response = session.get("http://localhost:3000", timeout=5)
             if response.status_code == 200:
                 print("✅ Frontend server is responding")
             else:
                 print(f"⚠️  Frontend responded with status {response.status_code}")
         except Exception as e:
             print(f"❌ Frontend server not responding: {e}")
+        finally:
+            session.close()
     
     def stop_servers(self):
         """Stop both servers"""
         print("\n🛑 Stopping servers...")
+        self.shutdown_event.set()
         
         if self.backend_process:
             try:
@@ -190,6 +241,56 @@ class ServerRunner:
                 self.frontend_process.kill()
                 print("🔪 Frontend server force killed")
     
+    def _wait_for_child_exit(self):
+        """Block until either server process exits"""
+        processes = [p for p in (self.backend_process, self.frontend_process) if p]
+        if hasattr(signal, "SIGCHLD"):
+            self._wait_sigchld(processes)
+        elif os.name == "nt" and self._wait_handles(processes):
+            return
+        else:
+            while not self.shutdown_event.wait(1):
+                if any(p.poll() is not None for p in processes):
+                    return
+    
+    def _wait_sigchld(self, processes):
+        """POSIX: sleep in select() until SIGCHLD arrives through the wakeup fd"""
+        reader, writer = socket.socketpair()
+        reader.setblocking(False)
+        writer.setblocking(False)
+        previous_handler = signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+        previous_fd = signal.set_wakeup_fd(writer.fileno())
+        try:
+            # Any child (e.g. a browser launcher) can raise SIGCHLD, so re-check ours
+            while all(p.poll() is None for p in processes):
+                select.select([reader], [], [])
+                try:
+                    while reader.recv(4096):
+                        pass
+                except BlockingIOError:
+                    pass
+        finally:
+            signal.set_wakeup_fd(previous_fd)
+            signal.signal(signal.SIGCHLD, previous_handler)
+            reader.close()
+            writer.close()
+    
+    def _wait_handles(self, processes):
+        """Windows: wait on the process handles; False if the wait failed"""
+        import ctypes
+        from ctypes import wintypes
+        
+        wait = ctypes.windll.kernel32.WaitForMultipleObjects
+        wait.argtypes = [wintypes.DWORD, ctypes.POINTER(wintypes.HANDLE), wintypes.BOOL, wintypes.DWORD]
+        wait.restype = wintypes.DWORD
+        handles = (wintypes.HANDLE * len(processes))(*(int(p._handle) for p in processes))
+        
+        # Bounded waits keep Ctrl+C responsive
+        while True:
+            result = wait(len(processes), handles, False, 1000)
+            if result != 0x102:  # WAIT_TIMEOUT
+                return result != 0xFFFFFFFF  # WAIT_FAILED
+    
     def run(self):
         """Main run method"""
         print("🎯 AI Interview Bot - Full Stack Server Runner")
@@ -200,13 +301,21 @@ class ServerRunner:
             if not self.check_dependencies():
                 return
             
-            # Start backend
-            if not self.start_backend():
-                return
+            # Start backend and frontend side by side
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                backend = executor.submit(self.start_backend)
+                frontend = executor.submit(self.start_frontend)
+                # One failing start stops the other waiting on its port
+                backend.add_done_callback(lambda f: f.result() or self.shutdown_event.set())
+                frontend.add_done_callback(lambda f: f.result() or self.shutdown_event.set())
+                try:
+                    started = backend.result() and frontend.result()
+                except BaseException:
+                    # Ctrl+C mid-startup: release both workers before the pool joins them
+                    self.shutdown_event.set()
+                    raise
             
-            # Start frontend
-            if not self.start_frontend():
-                self.stop_servers()
+            if not started:
                 return
             
             # Test servers
@@ -228,15 +337,12 @@ class ServerRunner:
             
             # Wait for interrupt
             try:
-                while True:
-                    time.sleep(1)
-                    # Check if processes are still running
-                    if self.backend_process and self.backend_process.poll() is not None:
-                        print("❌ Backend process died unexpectedly")
-                        break
-                    if self.frontend_process and self.frontend_process.poll() is not None:
-                        print("❌ Frontend process died unexpectedly")
-                        break
+                self._wait_for_child_exit()
+                # Check which process stopped
+                if self.backend_process and self.backend_process.poll() is not None:
+                    print("❌ Backend process died unexpectedly")
+                elif self.frontend_process and self.frontend_process.poll() is not None:
+                    print("❌ Frontend process died unexpectedly")
             except KeyboardInterrupt:
                 print("\n📝 Received interrupt signal")
                 
@@ -5,11 +5,30 @@ Simple script to run both frontend and backend servers
 
 import subprocess
 import sys
-import os
+import shutil
 import time
 import webbrowser
 from pathlib import Path
 
+# Children run detached from this console; their output goes to log files
+DETACHED_FLAGS = (
+    getattr(subprocess, "DETACHED_PROCESS", 0)
+    | getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0)
+)
+
+def start_detached(cmd, cwd, log_path):
+    """Launch cmd directly (no cmd.exe hop) with output appended to log_path"""
+    with open(log_path, "ab") as log:
+        return subprocess.Popen(
+            cmd,
+            cwd=str(cwd),
+            creationflags=DETACHED_FLAGS,
+            start_new_session=(DETACHED_FLAGS == 0),
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+
 def main():
     print("AI Interview Bot - Starting both servers")
     print("=" * 40)
@@ -18,18 +37,23 @@ def main():
     backend_dir = base_dir / "backend"
     frontend_dir = base_dir / "frontend"
     
-    # Start backend in a new window
+    backend_log = base_dir / "backend.log"
+    frontend_log = base_dir / "frontend.log"
+    
+    # Start backend detached
     print("Starting backend server...")
-    backend_cmd = f'start "Backend Server" /D "{backend_dir}" python start_server.py'
-    os.system(backend_cmd)
+    start_detached([sys.executable, "start_server.py"], backend_dir, backend_log)
     
     # Wait a moment
     time.sleep(3)
     
-    # Start frontend in a new window
+    # Start frontend detached
     print("Starting frontend server...")
-    frontend_cmd = f'start "Frontend Server" /D "{frontend_dir}" npm start'
-    os.system(frontend_cmd)
+    npm = shutil.which("npm.cmd") or shutil.which("npm")
+    if npm is None:
+        print("npm not found - frontend not started")
+    else:
+        start_detached([npm, "start"], frontend_dir, frontend_log)
     
     # Wait for servers to start
     time.sleep(5)
@@ -66,7 +90,7 @@ def main():
     except:
         print("Could not open browser automatically")
     
-    print("Check the separate console windows for server logs")
+    print(f"Server logs: {backend_log} and {frontend_log}")
     print("Press Enter to exit this script (servers will keep running)")
     input()
 
@@ -2,22 +2,74 @@
 Setup script to install AI features for interview analysis
 Run this to enable transcription and facial analysis
 """
+import shutil
 import subprocess
 import sys
 
-def install_package(package):
-    """Install a package using pip"""
+# Prefer wheels and never prompt; pip's wheel cache (PIP_CACHE_DIR) speeds up re-runs
+PIP_INSTALL = [sys.executable, "-m", "pip", "install", "--prefer-binary", "--no-input"]
+
+# Pure-Python packages published only as sdists; everything else must be a wheel
+# on the first attempt so nothing is compiled locally
+SDIST_ONLY_PACKAGES = {"openai-whisper"}
+
+def installer_command():
+    """
+    Install command prefix: uv (parallel downloads, fast resolver) when it is
+    on PATH or can be bootstrapped with pip, plain pip otherwise
+    """
+    uv = shutil.which("uv")
+    uv_cmd = [uv] if uv else [sys.executable, "-m", "uv"]
+    if not uv:
+        try:
+            subprocess.check_call([*PIP_INSTALL, "--quiet", "uv"])
+        except subprocess.CalledProcessError:
+            print("ℹ uv not available, installing with pip")
+            return PIP_INSTALL
+    # Target this interpreter explicitly rather than whatever uv discovers
+    return [*uv_cmd, "pip", "install", "--python", sys.executable]
+
+def wheel_only_args(packages):
+    """pip options forbidding source builds, except for known sdist-only packages"""
+    args = ["--only-binary=:all:"]
+    args += [f"--no-binary={package}" for package in packages if package in SDIST_ONLY_PACKAGES]
+    return args
+
+def install_package(package, installer=PIP_INSTALL):
+    """Install a package using pip (or the given installer)"""
     print(f"\n{'='*60}")
     print(f"Installing {package}...")
     print('='*60)
     try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", package])
+        subprocess.check_call([*installer, package])
         print(f"✓ {package} installed successfully")
         return True
     except subprocess.CalledProcessError as e:
         print(f"✗ Failed to install {package}: {e}")
         return False
 
+def install_packages(packages, installer=PIP_INSTALL):
+    """
+    Install all packages with a single pip run (one dependency resolution)
+    
+    Wheels only at first; if that cannot resolve, allow source builds.
+    If the combined install still fails, retry package by package to find
+    out which ones failed.
+    """
+    print(f"\n{'='*60}")
+    print(f"Installing {', '.join(packages)}...")
+    print('='*60)
+    for extra_args in (wheel_only_args(packages), []):
+        try:
+            subprocess.check_call([*installer, *extra_args, *packages])
+            print("✓ All packages installed successfully")
+            return {package: True for package in packages}
+        except subprocess.CalledProcessError as e:
+            if extra_args:
+                print(f"✗ Wheel-only install failed ({e}), retrying with source builds allowed (slower)")
+    print("✗ Combined install failed, retrying packages individually")
+    return {package: install_package(package, installer) for package in packages}
+
 def main():
     print("\n🤖 AI INTERVIEW FEATURE SETUP")
     print("="*60)
@@ -40,9 +92,7 @@ def main():
         "tensorflow",  # Required by DeepFace
     ]
     
-    results = {}
-    for package in packages:
-        results[package] = install_package(package)
+    results = install_packages(packages, installer_command())
     
     print("\n" + "="*60)
     print("INSTALLATION SUMMARY")
@@ -1,32 +1,147 @@
 import os
 import json
+import base64
+import hashlib
+import threading
+from pathlib import Path
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
+from bson import Binary
 from pymongo import MongoClient, ASCENDING
 from pymongo.collection import Collection
 from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+try:
+    import zstandard as zstd
+except ImportError:
+    zstd = None
 
 
 _client: Optional[MongoClient] = None
 _collection: Optional[Collection] = None
+_collection_lock = threading.Lock()
+_indexes_ensured = False
+
+# Marker files recording index setup already done for a URI/collection/TTL,
+# so restarted workers skip createIndexes
+INDEX_MARKER_DIR = Path(os.getenv("MONGODB_INDEX_MARKER_DIR", Path.home() / ".cache" / "ai_app"))
+
+# raw_text is encrypted with AES-256-GCM under a key derived from
+# PII_FERNET_KEY with HKDF (never the Fernet key bytes themselves), stored as
+# nonce || ciphertext+tag and marked by the top-level raw_text_encryption
+# field. Older documents hold Fernet tokens.
+RAW_TEXT_ENCRYPTION = "AES-256-GCM"
+_NONCE_SIZE = 12
+_AESGCM_KEY_INFO = b"transcript-aesgcm"
+
+# Ciphertext does not compress, so long plaintext is zstd-compressed before
+# encryption (marked by the top-level raw_text_compression field). Shorter
+# texts are stored as-is.
+RAW_TEXT_COMPRESSION = "zstd3"
+RAW_TEXT_COMPRESS_MIN_BYTES = int(os.getenv("RAW_TEXT_COMPRESS_MIN_BYTES", "1024"))
+
+# zstd (de)compressors are not safe to share between threads
+_zstd_local = threading.local()
+
+# Ciphers built once from PII_FERNET_KEY (None if unset or invalid)
+_aesgcm: Optional[AESGCM] = None
+_fernet: Optional[Fernet] = None
+_ciphers_checked = False
+_ciphers_lock = threading.Lock()
+
+
+def _derive_aesgcm_key(fernet_key: str) -> bytes:
+    hkdf = HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=_AESGCM_KEY_INFO)
+    return hkdf.derive(base64.urlsafe_b64decode(fernet_key))
+
+
+def _load_ciphers() -> None:
+    global _aesgcm, _fernet, _ciphers_checked
+    if _ciphers_checked:
+        return
+
+    with _ciphers_lock:
+        if not _ciphers_checked:
+            key = os.getenv("PII_FERNET_KEY")
+            if key:
+                try:
+                    _fernet = Fernet(key)
+                    _aesgcm = AESGCM(_derive_aesgcm_key(key))
+                except Exception:
+                    _fernet = None
+                    _aesgcm = None
+            _ciphers_checked = True
+
+
+def _get_aesgcm() -> Optional[AESGCM]:
+    _load_ciphers()
+    return _aesgcm
 
 
 def _get_fernet() -> Optional[Fernet]:
-    key = os.getenv("PII_FERNET_KEY")
-    if not key:
-        return None
-    try:
-        return Fernet(key)
-    except Exception:
+    _load_ciphers()
+    return _fernet
+
+
+def _zstd_compress(data: bytes) -> bytes:
+    cctx = getattr(_zstd_local, "cctx", None)
+    if cctx is None:
+        cctx = _zstd_local.cctx = zstd.ZstdCompressor(level=3)
+    return cctx.compress(data)
+
+
+def _zstd_decompress(data: bytes) -> bytes:
+    if zstd is None:
+        raise RuntimeError("zstandard is required to read compressed transcripts")
+    dctx = getattr(_zstd_local, "dctx", None)
+    if dctx is None:
+        dctx = _zstd_local.dctx = zstd.ZstdDecompressor()
+    return dctx.decompress(data)
+
+
+def decrypt_raw_text(doc: Dict[str, Any]) -> Optional[str]:
+    """Return a stored transcript's raw text, decrypting it if needed"""
+    if "raw_text" in doc:
+        return doc["raw_text"]
+    encrypted = doc.get("raw_text_encrypted")
+    if encrypted is None:
         return None
 
+    if doc.get("raw_text_encryption") == RAW_TEXT_ENCRYPTION:
+        aesgcm = _get_aesgcm()
+        if aesgcm is None:
+            raise RuntimeError("PII_FERNET_KEY is not set")
+        data = bytes(encrypted)
+        plaintext = aesgcm.decrypt(data[:_NONCE_SIZE], data[_NONCE_SIZE:], None)
+        if doc.get("raw_text_compression") == RAW_TEXT_COMPRESSION:
+            plaintext = _zstd_decompress(plaintext)
+        return plaintext.decode("utf-8")
+
+    # Legacy Fernet token (Fernet is kept only to read these)
+    f = _get_fernet()
+    if f is None:
+        raise RuntimeError("PII_FERNET_KEY is not set")
+    return f.decrypt(bytes(encrypted)).decode("utf-8")
+
 
 def get_collection() -> Collection:
-    global _client, _collection
     if _collection is not None:
         return _collection
 
+    # Double-checked so concurrent first calls build a single MongoClient
+    with _collection_lock:
+        if _collection is not None:
+            return _collection
+        return _init_collection()
+
+
+def _init_collection() -> Collection:
+    global _client, _collection
+
     uri = os.getenv("MONGODB_URI")
     db_name = os.getenv("MONGODB_DB", "ai_app")
     coll_name = os.getenv("MONGODB_COLLECTION", "transcripts")
@@ -34,60 +149,136 @@ def get_collection() -> Collection:
     if not uri:
         raise RuntimeError("MONGODB_URI is not set")
 
-    _client = MongoClient(uri, retryWrites=True)
-    db = _client[db_name]
-    _collection = db[coll_name]
+    client = MongoClient(uri, retryWrites=True)
+    db = client[db_name]
+    collection = db[coll_name]
 
-    # Indexes: user_id + created_at, TTL optional via env
-    _collection.create_index([("user_id", ASCENDING), ("created_at", ASCENDING)])
+    _ensure_indexes(collection, uri, db_name, coll_name)
+
+    # Publish only once set up, so the lock-free fast path never sees a partial init
+    _client = client
+    _collection = collection
+    return _collection
+
+
+def _index_marker(uri: str, db_name: str, coll_name: str, ttl_days: Optional[str]) -> Path:
+    digest = hashlib.sha1(f"{uri}|{db_name}|{coll_name}|{ttl_days or ''}".encode("utf-8")).hexdigest()
+    return INDEX_MARKER_DIR / f"mongo_idx_{digest}"
+
+
+def _ensure_indexes(collection: Collection, uri: str, db_name: str, coll_name: str) -> None:
+    """Create indexes once per process, and once per machine via the marker file"""
+    global _indexes_ensured
+    if _indexes_ensured:
+        return
 
     ttl_days = os.getenv("MONGODB_TTL_DAYS")
+    marker = _index_marker(uri, db_name, coll_name, ttl_days)
+    if marker.exists():
+        _indexes_ensured = True
+        return
+
+    # Indexes: user_id + created_at, TTL optional via env
+    collection.create_index([("user_id", ASCENDING), ("created_at", ASCENDING)])
+
     if ttl_days:
         # Create TTL index on created_at
         try:
             seconds = int(float(ttl_days) * 86400)
-            _collection.create_index("created_at", expireAfterSeconds=seconds)
+            collection.create_index("created_at", expireAfterSeconds=seconds)
         except Exception:
             pass
 
-    return _collection
+    _indexes_ensured = True
+    try:
+        marker.parent.mkdir(parents=True, exist_ok=True)
+        marker.touch()
+    except OSError:
+        pass
 
 
-def store_transcript(
+def _build_doc(
     *,
     user_id: str,
     raw_text: str,
     tokenized_text: str,
     meta: Dict[str, Any],
     timestamp: Optional[datetime] = None,
-) -> str:
-    """
-    Store both raw and tokenized text with metadata.
-    - raw_text is encrypted at rest if PII_FERNET_KEY is configured.
-    - tokenized_text should already be anonymized/masked/redacted.
-    """
-    col = get_collection()
-
-    created_at = datetime.now(timezone.utc)
-    input_ts = timestamp.astimezone(timezone.utc) if timestamp else created_at
+    created_at: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    if created_at is None:
+        created_at = datetime.now(timezone.utc)
+    if timestamp is None:
+        input_ts = created_at
+    elif timestamp.tzinfo is timezone.utc:
+        input_ts = timestamp
+    else:
+        input_ts = timestamp.astimezone(timezone.utc)
 
-    f = _get_fernet()
+    # meta is owned by the document from here on (no defensive copy)
+    aesgcm = _get_aesgcm()
+    meta["stored_with_encryption"] = aesgcm is not None
     doc: Dict[str, Any] = {
         "user_id": user_id,
         "tokenized_text": tokenized_text,
-        "meta": {
-            **meta,
-            "stored_with_encryption": bool(f is not None),
-        },
+        "meta": meta,
         "created_at": created_at,
         "input_timestamp": input_ts,
     }
 
-    if f is not None:
-        doc["raw_text_encrypted"] = f.encrypt(raw_text.encode("utf-8"))
+    if aesgcm is not None:
+        payload = raw_text.encode("utf-8")
+        if zstd is not None and len(payload) >= RAW_TEXT_COMPRESS_MIN_BYTES:
+            payload = _zstd_compress(payload)
+            doc["raw_text_compression"] = RAW_TEXT_COMPRESSION
+        nonce = os.urandom(_NONCE_SIZE)
+        doc["raw_text_encrypted"] = Binary(nonce + aesgcm.encrypt(nonce, payload, None))
+        doc["raw_text_encryption"] = RAW_TEXT_ENCRYPTION
     else:
         # fallback: store plaintext, but mark in meta
         doc["raw_text"] = raw_text
 
+    return doc
+
+
+def store_transcript(
+    *,
+    user_id: str,
+    raw_text: str,
+    tokenized_text: str,
+    meta: Dict[str, Any],
+    timestamp: Optional[datetime] = None,
+) -> str:
+    """
+    Store both raw and tokenized text with metadata.
+    - raw_text is encrypted at rest if PII_FERNET_KEY is configured.
+    - tokenized_text should already be anonymized/masked/redacted.
+    - meta is stored as given and updated in place; pass a dict you own.
+    """
+    col = get_collection()
+    doc = _build_doc(
+        user_id=user_id,
+        raw_text=raw_text,
+        tokenized_text=tokenized_text,
+        meta=meta,
+        timestamp=timestamp,
+    )
     res = col.insert_one(doc)
     return str(res.inserted_id)
+
+
+def store_transcripts_bulk(items: List[Dict[str, Any]]) -> List[str]:
+    """
+    Store many transcripts with one unordered insert_many.
+    Each item takes the same keyword arguments as store_transcript
+    (including its in-place use of meta).
+    Returns inserted document ids as strings, in item order.
+    """
+    if not items:
+        return []
+    col = get_collection()
+    # One created_at for the whole batch
+    created_at = datetime.now(timezone.utc)
+    docs = [_build_doc(**item, created_at=created_at) for item in items]
+    res = col.insert_many(docs, ordered=False)
+    return [str(inserted_id) for inserted_id in res.inserted_ids]
@@ -1,20 +1,30 @@
 import os
 import json
+import logging
+import threading
+import time
 from datetime import datetime
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional
 
-from pii_sanitizer_enhanced import EnhancedPIISanitizer
-from storage_mongo import store_transcript
+from pii_sanitizer_enhanced import EnhancedPIISanitizer, SanitizationResult
+from storage_mongo import store_transcript, store_transcripts_bulk
 
+logger = logging.getLogger(__name__)
 
 _sanitizer: Optional[EnhancedPIISanitizer] = None
+_sanitizer_lock = threading.Lock()
 
 def get_sanitizer() -> EnhancedPIISanitizer:
     global _sanitizer
-    if _sanitizer is None:
-        mode = os.getenv("PII_MODE", "mask")  # mask|redact|hash|encrypt
-        hipaa = os.getenv("PII_HIPAA_MODE", "true").lower() in {"1", "true", "yes"}
-        _sanitizer = EnhancedPIISanitizer(mode=mode, hipaa_mode=hipaa)
+    if _sanitizer is not None:
+        return _sanitizer
+
+    # Double-checked so concurrent first calls load the spaCy pipeline once
+    with _sanitizer_lock:
+        if _sanitizer is None:
+            mode = os.getenv("PII_MODE", "mask")  # mask|redact|hash|encrypt
+            hipaa = os.getenv("PII_HIPAA_MODE", "true").lower() in {"1", "true", "yes"}
+            _sanitizer = EnhancedPIISanitizer(mode=mode, hipaa_mode=hipaa)
     return _sanitizer
 
 
@@ -29,24 +39,188 @@ def process_and_store_transcript(*, user_id: str, transcript_text: str, timestam
     sanitizer = get_sanitizer()
     res = sanitizer.sanitize_text(transcript_text)
 
-    meta = {
-        "entity_counts": res.entity_counts,
-        "sanitizer_mode": res.mode,
-        "hipaa_mode": res.hipaa_mode,
-        # store minimal details to aid QA without raw content
-        "normalized": True,
-    }
-
     doc_id = store_transcript(
         user_id=user_id,
         raw_text=transcript_text,
         tokenized_text=res.anonymized_text,
-        meta=meta,
+        meta=_build_meta(res),
         timestamp=timestamp,
     )
     return doc_id
 
 
+def _build_meta(res: SanitizationResult) -> Dict[str, Any]:
+    return {
+        "entity_counts": res.entity_counts,
+        "sanitizer_mode": res.mode,
+        "hipaa_mode": res.hipaa_mode,
+        # store minimal details to aid QA without raw content
+        "normalized": True,
+    }
+
+
+def process_and_store_transcripts(items: List[Dict[str, Any]]) -> List[str]:
+    """
+    Batch variant of process_and_store_transcript.
+    Each item has user_id, transcript_text and optionally timestamp. Texts are
+    sanitized in one batched analyzer run and stored with a single insert_many.
+    Returns inserted document ids as strings, in item order.
+    """
+    if not items:
+        return []
+    sanitizer = get_sanitizer()
+    results = sanitizer.sanitize_texts([item["transcript_text"] for item in items])
+
+    return store_transcripts_bulk([
+        {
+            "user_id": item["user_id"],
+            "raw_text": item["transcript_text"],
+            "tokenized_text": res.anonymized_text,
+            "meta": _build_meta(res),
+            "timestamp": item.get("timestamp"),
+        }
+        for item, res in zip(items, results)
+    ])
+
+
+class TranscriptBuffer:
+    """
+    Accumulates transcripts and stores them in batches once max_items are
+    queued or the oldest queued transcript is max_age_seconds old. The age
+    limit is enforced by a timer, so a stream that goes quiet still gets
+    its tail stored; on_stored receives the ids of every stored batch.
+    A batch that fails to store is put back at the front of the queue,
+    whichever path flushed it. Call close() (or use it as a context
+    manager) at end of session: it waits for in-flight stores and drains
+    the queue.
+    """
+
+    def __init__(
+        self,
+        max_items: int = 50,
+        max_age_seconds: float = 5.0,
+        on_stored: Optional[Callable[[List[str]], None]] = None,
+    ):
+        self.max_items = max_items
+        self.max_age_seconds = max_age_seconds
+        self.on_stored = on_stored
+        self._items: List[Dict[str, Any]] = []
+        self._first_added = 0.0
+        self._timer: Optional[threading.Timer] = None
+        self._in_flight = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+
+    def add(self, *, user_id: str, transcript_text: str, timestamp: Optional[datetime] = None) -> List[str]:
+        """Queue a transcript; returns inserted ids if this triggered a flush"""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("TranscriptBuffer is closed")
+            if not self._items:
+                self._first_added = time.monotonic()
+                self._start_timer()
+            self._items.append({"user_id": user_id, "transcript_text": transcript_text, "timestamp": timestamp})
+            if (len(self._items) < self.max_items
+                    and time.monotonic() - self._first_added < self.max_age_seconds):
+                return []
+            items = self._take()
+        return self._store(items)
+
+    def flush(self) -> List[str]:
+        """Store all queued transcripts now"""
+        with self._lock:
+            items = self._take()
+        return self._store(items)
+
+    def close(self) -> List[str]:
+        """
+        Stop the age timer, wait for in-flight stores and store everything
+        left (including batches a failed store put back). Returns the ids
+        stored by this call.
+        """
+        stored: List[str] = []
+        with self._lock:
+            self._closed = True
+            self._cancel_timer()
+        while True:
+            with self._idle:
+                while self._in_flight:
+                    self._idle.wait()
+                items = self._take()
+            if not items:
+                return stored
+            stored.extend(self._store(items))
+
+    def __enter__(self) -> "TranscriptBuffer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _start_timer(self) -> None:
+        # caller holds the lock
+        if self._closed:
+            return
+        self._timer = threading.Timer(self.max_age_seconds, self._flush_expired)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _cancel_timer(self) -> None:
+        # caller holds the lock
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _take(self) -> List[Dict[str, Any]]:
+        # caller holds the lock; a non-empty batch counts as in flight
+        self._cancel_timer()
+        items, self._items = self._items, []
+        if items:
+            self._in_flight += 1
+        return items
+
+    def _store(self, items: List[Dict[str, Any]]) -> List[str]:
+        if not items:
+            return []
+        try:
+            ids = process_and_store_transcripts(items)
+        except Exception:
+            with self._idle:
+                # Requeue ahead of newer items; the timer retries it
+                if not self._items:
+                    self._first_added = time.monotonic()
+                self._items[:0] = items
+                if self._timer is None:
+                    self._start_timer()
+                self._in_flight -= 1
+                self._idle.notify_all()
+            raise
+        with self._idle:
+            self._in_flight -= 1
+            self._idle.notify_all()
+        if self.on_stored is not None:
+            self.on_stored(ids)
+        return ids
+
+    def _flush_expired(self) -> None:
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Timed transcript flush failed, retrying: {e}")
+
+
+def warm_up() -> None:
+    """
+    Load the sanitizer (spaCy/Presidio models) ahead of the first transcript
+
+    A preforking server should call this in the master before forking
+    workers (e.g. from a gunicorn --preload app module), so the workers
+    share one copy of the models instead of each loading their own.
+    """
+    get_sanitizer()
+
+
 if __name__ == "__main__":
     import argparse
     import sys
@@ -54,9 +228,13 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Process and store a transcript")
     parser.add_argument("--user-id", required=True)
     parser.add_argument("--timestamp", default=None, help="ISO8601 timestamp")
+    parser.add_argument(
+        "--lines",
+        action="store_true",
+        help="Treat each non-empty stdin line as a transcript and store them in batches",
+    )
     args = parser.parse_args()
 
-    text = sys.stdin.read()
     ts = None
     if args.timestamp:
         try:
@@ -64,5 +242,15 @@ if __name__ == "__main__":
         except Exception:
             ts = None
 
-    doc_id = process_and_store_transcript(user_id=args.user_id, transcript_text=text, timestamp=ts)
-    print(json.dumps({"inserted_id": doc_id}))
+    if args.lines:
+        inserted_ids: List[str] = []
+        with TranscriptBuffer(on_stored=inserted_ids.extend) as buffer:
+            for raw_line in sys.stdin.buffer:
+                line = raw_line.decode("utf-8", "ignore").strip()
+                if line:
+                    buffer.add(user_id=args.user_id, transcript_text=line, timestamp=ts)
+        print(json.dumps({"inserted_ids": inserted_ids}))
+    else:
+        text = sys.stdin.buffer.read().decode("utf-8", "ignore")
+        doc_id = process_and_store_transcript(user_id=args.user_id, transcript_text=text, timestamp=ts)
+        print(json.dumps({"inserted_id": doc_id}))
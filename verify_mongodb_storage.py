@@ -2,15 +2,53 @@
 Verification script to check what's actually stored in MongoDB
 """
 
-import asyncio
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient
 from datetime import datetime
 
-async def check_mongodb_storage():
+PREVIEW_CHARS = 100
+
+def _text_summary(field):
+    """Server-side preview and length of a string field, omitted when absent"""
+    is_string = {"$eq": [{"$type": f"${field}"}, "string"]}
+    return {
+        f"{field}_preview": {"$cond": [is_string, {"$substrCP": [f"${field}", 0, PREVIEW_CHARS]}, "$$REMOVE"]},
+        f"{field}_len": {"$cond": [is_string, {"$strLenCP": f"${field}"}, "$$REMOVE"]},
+    }
+
+def _array_summary(field, preview):
+    """Server-side head and size of an array field, omitted when absent"""
+    is_array = {"$isArray": f"${field}"}
+    summary = {f"{field}_len": {"$cond": [is_array, {"$size": f"${field}"}, "$$REMOVE"]}}
+    if preview:
+        summary[f"{field}_preview"] = {"$cond": [is_array, {"$slice": [f"${field}", preview]}, "$$REMOVE"]}
+    return summary
+
+# Latest answer with texts, tokens and embedding trimmed by the server
+LATEST_ANSWER_PIPELINE = [
+    {"$sort": {"created_at": -1}},
+    {"$limit": 1},
+    {"$project": {
+        "session_id": 1,
+        "user_id": 1,
+        "created_at": 1,
+        **_text_summary("original_text"),
+        **_text_summary("redacted_text"),
+        **_text_summary("cleaned_text"),
+        **_array_summary("tokens", 10),
+        "token_count": 1,
+        "stt_confidence": 1,
+        **_array_summary("embedding", 0),
+        "embedding_present": 1,
+        "pii_metadata": 1,
+        "pii_vault_id": 1,
+    }},
+]
+
+def check_mongodb_storage():
     """Check what's stored in MongoDB answers collection"""
     
     # Connect to MongoDB
-    client = AsyncIOMotorClient("mongodb://localhost:27017")
+    client = MongoClient("mongodb://localhost:27017", serverSelectionTimeoutMS=2000)
     db = client["interview_db"]
     
     print("=" * 70)
@@ -18,7 +56,7 @@ async def check_mongodb_storage():
     print("=" * 70)
     
     # Count total documents
-    total_count = await db.answers.count_documents({})
+    total_count = db.answers.count_documents({})
     print(f"\n📊 Total answers in database: {total_count}")
     
     if total_count == 0:
@@ -27,7 +65,7 @@ async def check_mongodb_storage():
         return
     
     # Get latest document
-    latest = await db.answers.find_one(sort=[("created_at", -1)])
+    latest = next(db.answers.aggregate(LATEST_ANSWER_PIPELINE), None)
     
     if not latest:
         print("\n⚠️  Could not retrieve latest answer")
@@ -41,38 +79,35 @@ async def check_mongodb_storage():
     print()
     
     # Check original_text
-    if 'original_text' in latest:
-        original = latest['original_text']
-        print(f"✅ original_text: PRESENT ({len(original)} chars)")
-        print(f"   Preview: {original[:100]}...")
+    if 'original_text_len' in latest:
+        print(f"✅ original_text: PRESENT ({latest['original_text_len']} chars)")
+        print(f"   Preview: {latest['original_text_preview']}...")
     else:
         print(f"❌ original_text: MISSING")
     
     print()
     
     # Check redacted_text
-    if 'redacted_text' in latest:
-        redacted = latest['redacted_text']
-        print(f"✅ redacted_text: PRESENT ({len(redacted)} chars)")
-        print(f"   Preview: {redacted[:100]}...")
+    if 'redacted_text_len' in latest:
+        print(f"✅ redacted_text: PRESENT ({latest['redacted_text_len']} chars)")
+        print(f"   Preview: {latest['redacted_text_preview']}...")
     else:
         print(f"ℹ️  redacted_text: Not present (using original_text)")
     
     print()
     
     # Check cleaned_text
-    if 'cleaned_text' in latest:
-        cleaned = latest['cleaned_text']
-        print(f"✅ cleaned_text: PRESENT ({len(cleaned)} chars)")
+    if 'cleaned_text_len' in latest:
+        print(f"✅ cleaned_text: PRESENT ({latest['cleaned_text_len']} chars)")
     else:
         print(f"ℹ️  cleaned_text: Not present")
     
     print()
     
     # Check tokens
-    if 'tokens' in latest:
-        tokens = latest['tokens']
-        token_count = latest.get('token_count', len(tokens))
+    if 'tokens_len' in latest:
+        tokens = latest['tokens_preview']
+        token_count = latest.get('token_count', latest['tokens_len'])
         print(f"✅ tokens: PRESENT (array with {token_count} tokens)")
         print(f"   First 10 tokens: {tokens[:10]}")
         print(f"   Sample tokens: {tokens[:5]}")
@@ -91,11 +126,11 @@ async def check_mongodb_storage():
     
     # Check other fields
     print("Other fields present:")
-    for key in ['stt_confidence', 'embedding', 'embedding_present', 'pii_metadata', 'pii_vault_id']:
+    for key in ['stt_confidence', 'embedding_len', 'embedding_present', 'pii_metadata', 'pii_vault_id']:
         if key in latest:
             value = latest[key]
-            if key == 'embedding':
-                print(f"  - {key}: {type(value).__name__} with {len(value) if value else 0} dimensions")
+            if key == 'embedding_len':
+                print(f"  - embedding: list with {value} dimensions")
             else:
                 print(f"  - {key}: {value}")
     
@@ -103,8 +138,8 @@ async def check_mongodb_storage():
     print("SUMMARY")
     print("=" * 70)
     
-    has_text = 'original_text' in latest or 'redacted_text' in latest
-    has_tokens = 'tokens' in latest
+    has_text = 'original_text_len' in latest or 'redacted_text_len' in latest
+    has_tokens = 'tokens_len' in latest
     
     if has_text and has_tokens:
         print("✅ SUCCESS: Both text and tokens are stored in MongoDB!")
@@ -122,4 +157,4 @@ async def check_mongodb_storage():
     client.close()
 
 if __name__ == "__main__":
-    asyncio.run(check_mongodb_storage())
+    check_mongodb_storage()